@@ -0,0 +1,179 @@
+import discord
+import asyncio
+import json
+from discord import app_commands
+from discord.ext import commands
+from datetime import datetime as dt
+from utils.alerts import SIDES, ABOVE, BELOW
+
+SIDE_LABELS = {SIDES["buy"]: "Kaufpreis", SIDES["sell"]: "Verkaufspreis"}
+
+class AlertCog(commands.Cog):
+    """A Discord Cog that lets users subscribe to price alerts, delivered by DM after each market refresh."""
+
+    def __init__(self, bot: commands.Bot):
+        """Initializes the AlertCog."""
+        self.bot = bot
+        self.config_file = "data/config.json"
+
+        # Load the config file and set embed color
+        with open(self.config_file, "r") as f:
+            self.config = json.load(f)
+        self.embed_color = int(self.config['embed_hex'], 16)
+
+        # Fired alerts grouped per user, waiting to be sent as one DM each
+        self.notifications = asyncio.Queue()
+        self.dm_interval = 1 / self.config.get('alert_dm_rate', 2)
+        self.evaluate_lock = asyncio.Lock()
+
+    async def cog_load(self):
+        """Subscribe to snapshot store updates and start the DM sender when the cog is loaded."""
+        self.bot.store.subscribe(self.on_store_update)
+        self.sender = self.bot.loop.create_task(self.send_notifications())
+
+    async def cog_unload(self):
+        """Unsubscribe from snapshot store updates and stop the DM sender when the cog is unloaded."""
+        self.bot.store.unsubscribe(self.on_store_update)
+        self.sender.cancel()
+
+    def on_store_update(self, datasets: set[str]):
+        """Evaluate the alerts once new prices were published."""
+        if "price_index" in datasets:
+            self.bot.loop.create_task(self.evaluate_alerts())
+
+    async def evaluate_alerts(self):
+        """Fire all alerts reached by the current prices in one pass and queue one notification per user."""
+        async with self.evaluate_lock:
+            price_index = self.bot.store.get("price_index")
+            fired = await self.bot.alerts.evaluate(price_index)
+
+        per_user = {}
+        for _, user_id, material, side, direction, threshold in fired:
+            record = price_index[material]
+            price = record.buy if side == SIDES["buy"] else record.sell
+            per_user.setdefault(user_id, []).append((material, side, direction, threshold, price))
+        for user_id, alerts in per_user.items():
+            self.notifications.put_nowait((user_id, alerts))
+
+        if fired:
+            current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"[{current_time}] Fired {len(fired)} price alerts for {len(per_user)} users")
+
+    async def send_notifications(self):
+        """Send the queued notifications as DMs, at most `alert_dm_rate` per second."""
+        while True:
+            user_id, alerts = await self.notifications.get()
+            try:
+                user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+                await user.send(embed=self.build_notification(alerts))
+            except discord.HTTPException as e:
+                # Closed DMs or deleted accounts; the alerts have fired either way
+                current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+                print(f"[{current_time}] Could not send price alerts to {user_id}: {e}")
+            await asyncio.sleep(self.dm_interval)
+
+    def build_notification(self, alerts: list[tuple]) -> discord.Embed:
+        """Build the DM embed listing a user's fired alerts."""
+        lines = []
+        for material, side, direction, threshold, price in alerts:
+            movement = "über" if direction == ABOVE else "unter"
+            lines.append(f"**{self.item_label(material)}**: {SIDE_LABELS[side]} {movement} {self.format_price(threshold)} "
+                         f"(aktuell {self.format_price(price)})")
+        embed = discord.Embed(title="__Preisalarm__", description="\n".join(lines)[:4096], color=self.embed_color)
+        embed.set_footer(text=f"{self.config['name']} • JinglingJester")
+        return embed
+
+    def item_label(self, material: str) -> str:
+        """Return the German display name of a material."""
+        market = self.bot.get_cog("MarketCog")
+        return market.format_item_name(self.bot.store.get("items").get(material, material))
+
+    def format_price(self, price: float) -> str:
+        """Format a price with one decimal, like the statistics of /price."""
+        return self.bot.get_cog("MarketCog").format_stat(price)
+
+    @app_commands.command(name="alert", description="Get a DM when an item's price crosses a threshold")
+    @app_commands.describe(item_name="The item to watch", direction="Notify when the price rises above or falls below the threshold",
+                           price="The threshold in coins", side="Watch the buy or the sell price")
+    @app_commands.choices(direction=[
+        app_commands.Choice(name="above", value=ABOVE),
+        app_commands.Choice(name="below", value=BELOW)
+    ], side=[
+        app_commands.Choice(name="buy", value=SIDES["buy"]),
+        app_commands.Choice(name="sell", value=SIDES["sell"])
+    ])
+    async def alert(self, interaction: discord.Interaction, item_name: str, direction: int,
+                    price: app_commands.Range[float, 0], side: int = SIDES["buy"]):
+        """
+        A slash command that subscribes the user to a price alert.
+
+        Args:
+            interaction (discord.Interaction): The interaction object that represents the command invocation.
+            item_name (str): The item to watch, in English or German.
+            direction (int): ABOVE or BELOW.
+            price (float): The threshold in coins.
+            side (int): Whether the buy or the sell price is watched.
+        """
+        material, _ = self.bot.get_cog("MarketCog").find_best_match(item_name, self.bot.store.get("items"))
+        if not material:
+            await interaction.response.send_message("Kein passender Item gefunden.", ephemeral=True, delete_after=10)
+            return
+
+        # An alert that would fire right away is answered right away; a price of 0 means there are no orders
+        record = self.bot.store.get("price_index").get(material)
+        current = (record.buy if side == SIDES["buy"] else record.sell) if record else None
+        if current and (current >= price if direction == ABOVE else current <= price):
+            movement = "über" if direction == ABOVE else "unter"
+            await interaction.response.send_message(
+                f"Der {SIDE_LABELS[side]} von **{self.item_label(material)}** liegt bereits {movement} "
+                f"{self.format_price(price)} (aktuell {self.format_price(current)}).",
+                ephemeral=True
+            )
+            return
+
+        alert_id = await self.bot.alerts.add(interaction.user.id, material, side, direction, price)
+        if alert_id is None:
+            await interaction.response.send_message(
+                f"Du hast bereits {self.bot.alerts.max_per_user} Preisalarme. Lösche einen mit `/alert_remove`.",
+                ephemeral=True
+            )
+            return
+
+        movement = "über" if direction == ABOVE else "unter"
+        await interaction.response.send_message(
+            f"Preisalarm **#{alert_id}** gesetzt: Du bekommst eine DM, sobald der {SIDE_LABELS[side]} von "
+            f"**{self.item_label(material)}** {movement} {self.format_price(price)} liegt.",
+            ephemeral=True
+        )
+
+    @alert.autocomplete('item_name')
+    async def item_name_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Autocompletes the item_name field like the /price command."""
+        return await self.bot.get_cog("MarketCog").item_name_autocomplete(interaction, current)
+
+    @app_commands.command(name="alerts", description="List your price alerts")
+    async def alerts(self, interaction: discord.Interaction):
+        """A slash command that lists the user's active price alerts."""
+        rows = await self.bot.alerts.user_alerts(interaction.user.id)
+        if not rows:
+            await interaction.response.send_message("Du hast keine Preisalarme.", ephemeral=True, delete_after=10)
+            return
+
+        lines = [f"**#{alert_id}** {self.item_label(material)}: {SIDE_LABELS[side]} "
+                 f"{'über' if direction == ABOVE else 'unter'} {self.format_price(threshold)}"
+                 for alert_id, material, side, direction, threshold in rows]
+        embed = discord.Embed(title="__Deine Preisalarme__", description="\n".join(lines), color=self.embed_color)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="alert_remove", description="Delete one of your price alerts")
+    @app_commands.describe(alert_id="The number shown by /alerts")
+    async def alert_remove(self, interaction: discord.Interaction, alert_id: int):
+        """A slash command that deletes one of the user's price alerts."""
+        if await self.bot.alerts.remove(interaction.user.id, alert_id):
+            await interaction.response.send_message(f"Preisalarm **#{alert_id}** gelöscht.", ephemeral=True, delete_after=10)
+        else:
+            await interaction.response.send_message(f"Du hast keinen Preisalarm **#{alert_id}**.", ephemeral=True, delete_after=10)
+
+async def setup(bot: commands.Bot):
+    """Asynchronous setup function to add the AlertCog to the bot."""
+    await bot.add_cog(AlertCog(bot))
@@ -1,19 +1,7 @@
 import discord
-import aiosqlite
-import aiohttp
 from discord import app_commands
 from discord.ext import commands
 
-async def get_minecraft_uuid(username: str) -> str:
-    """Fetches the Minecraft UUID for a given username using the Mojang API."""
-    url = f"https://api.mojang.com/users/profiles/minecraft/{username}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                data = await response.json()
-                return data.get("id")
-    return None
-
 class giveRep(commands.Cog):
     """A Discord Cog that allows users to give reputation (Positive or Negative) to Minecraft users."""
 
@@ -45,7 +33,7 @@ class giveRep(commands.Cog):
             return
 
         # Fetch the Minecraft UUID for the given username
-        uuid = await get_minecraft_uuid(username)
+        uuid = await self.bot.uuid_resolver.resolve(username)
         if not uuid:
             await interaction.response.send_message(
                 f"Der Benutzername **{username}** existiert nicht in Minecraft.", 
@@ -57,50 +45,41 @@ class giveRep(commands.Cog):
         # Determine the reputation value (+1 for Positive, -1 for Negative)
         reputation_value = 1 if reputation == "Positive" else -1
 
-        # Interact with the SQLite database
-        async with aiosqlite.connect("data/reputation.db") as db:
-            # Check if the user exists in the users table
-            cursor = await db.execute("SELECT * FROM users WHERE uuid = ?", (uuid,))
-            user = await cursor.fetchone()
-
-            # If the user does not exist, insert them into the users table
-            if not user:
-                await db.execute("INSERT INTO users (uuid, username) VALUES (?, ?)", (uuid, username))
-                await db.commit()
-
-            # Check if the giver has already given reputation to the receiver
-            cursor = await db.execute("SELECT * FROM reputation WHERE giver_id = ? AND receiver_uuid = ?", (interaction.user.id, uuid))
+        # Insert or change the vote in a single statement. An unchanged vote matches no row and returns nothing;
+        # otherwise the revision tells a new vote (0) from a changed one. The resolver already stored the user, and the
+        # triggers on the table update the totals and the leaderboard in the same transaction.
+        async with self.bot.db.transaction() as db:
+            cursor = await db.execute("""INSERT INTO reputation (giver_id, receiver_uuid, reputation, guild_id) VALUES (?, ?, ?, ?)
+                                         ON CONFLICT (giver_id, receiver_uuid) DO UPDATE SET
+                                             reputation = excluded.reputation,
+                                             guild_id = excluded.guild_id,
+                                             revision = revision + 1
+                                         WHERE reputation != excluded.reputation
+                                         RETURNING revision""",
+                                      (interaction.user.id, uuid, reputation_value, interaction.guild_id))
             entry = await cursor.fetchone()
 
-            if entry:
-                current_rep = entry[3]
-                # If the reputation already exists and is the same, notify the user
-                if current_rep == reputation_value:
-                    await interaction.response.send_message(
-                        f"Du hast bereits eine **{reputation}** Reputation an **{username}** vergeben.", 
-                        ephemeral=True, 
-                        delete_after=10
-                    )
-                else:
-                    # If the reputation exists but is different, update it
-                    await db.execute("UPDATE reputation SET reputation = ? WHERE giver_id = ? AND receiver_uuid = ?",
-                                     (reputation_value, interaction.user.id, uuid))
-                    await db.commit()
-                    await interaction.response.send_message(
-                        f"Du hast deine Reputation für **{username}** auf **{reputation}** geändert.", 
-                        ephemeral=True, 
-                        delete_after=10
-                    )
-            else:
-                # If no reputation exists, insert the new reputation entry
-                await db.execute("INSERT INTO reputation (giver_id, receiver_uuid, reputation) VALUES (?, ?, ?)",
-                                 (interaction.user.id, uuid, reputation_value))
-                await db.commit()
-                await interaction.response.send_message(
-                    f"Du hast eine **{reputation}** Reputation an **{username}** vergeben.", 
-                    ephemeral=True, 
-                    delete_after=10
-                )
+        if entry is None:
+            # If the reputation already exists and is the same, notify the user
+            await interaction.response.send_message(
+                f"Du hast bereits eine **{reputation}** Reputation an **{username}** vergeben.", 
+                ephemeral=True, 
+                delete_after=10
+            )
+        elif entry[0]:
+            # If the reputation existed but was different, it has been changed
+            await interaction.response.send_message(
+                f"Du hast deine Reputation für **{username}** auf **{reputation}** geändert.", 
+                ephemeral=True, 
+                delete_after=10
+            )
+        else:
+            # Otherwise a new reputation entry has been inserted
+            await interaction.response.send_message(
+                f"Du hast eine **{reputation}** Reputation an **{username}** vergeben.", 
+                ephemeral=True, 
+                delete_after=10
+            )
 
     @giveRep.autocomplete('reputation')
     async def rep_autocomplete(self, interaction: discord.Interaction, current: str):
@@ -1,70 +1,214 @@
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
-import aiohttp
-from bs4 import BeautifulSoup
+from html.parser import HTMLParser
 import json
 import os
 from datetime import datetime, timedelta
 import asyncio
 import urllib.parse
+from utils.persist import load_json, write_json
+from utils.search import SearchIndex
+from utils.translations import normalize_string
+
+# Wiki category pages listing the OP items
+WIKI_URLS = [
+    "https://wiki.opsucht.net/op/spitzhacken/",
+    "https://wiki.opsucht.net/op/schwerter/",
+    "https://wiki.opsucht.net/op/aexte/",
+    "https://wiki.opsucht.net/op/schaufeln/",
+    "https://wiki.opsucht.net/op/hacken/",
+    "https://wiki.opsucht.net/op/ruestungen/",
+    "https://wiki.opsucht.net/op/schilde/",
+    "https://wiki.opsucht.net/op/boegen/",
+    "https://wiki.opsucht.net/op/armbrueste/",
+    "https://wiki.opsucht.net/op/angeln/",
+    "https://wiki.opsucht.net/op/talismane/",
+    "https://wiki.opsucht.net/op/fluegel/",
+    "https://wiki.opsucht.net/op/plueschtiere/",
+    "https://wiki.opsucht.net/op/sonstiges/"
+]
+
+# Outcomes of a wiki page download
+PAGE_CHANGED = "changed"
+PAGE_UNCHANGED = "unchanged"
+PAGE_FAILED = "failed"
+
+class ItemImageParser(HTMLParser):
+    """Streaming HTML parser that only collects the file names of OP item images, without building a document tree."""
+
+    def __init__(self):
+        super().__init__()
+        self.item_names = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "img":
+            src = dict(attrs).get("src")
+            if src and "assets/op" in src:
+                self.item_names.append(src.split("/")[-1])
+
+    handle_startendtag = handle_starttag
+
+def parse_item_names(html: str) -> list[str]:
+    """Return the item image file names on a wiki page, in page order."""
+    parser = ItemImageParser()
+    parser.feed(html)
+    parser.close()
+    return parser.item_names
 
 class DataFetcher(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.json_file_path = 'data/op_items_data.json'
+        self.pages_file_path = 'data/op_items_pages.json'
         self.config_file = "data/config.json"
 
         with open(self.config_file, "r") as f:
             self.config = json.load(f)
             self.embed_color = int(self.config['embed_hex'], 16)
 
-    async def download_data(self, url):
-        """Download data from the given URL and return the parsed HTML content."""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    return BeautifulSoup(html, 'html.parser')
-                else:
-                    return None
-
-    def levenshtein_distance(self, s1, s2):
-        """Calculate the Levenshtein distance between two strings."""
-        if len(s1) < len(s2):
-            return self.levenshtein_distance(s2, s1)
-        if len(s2) == 0:
-            return len(s1)
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-        return previous_row[-1]
-
-    async def find_best_match(self, query, items):
-        """Find the best matching item based on the query."""
-        query = query.lower()
-        best_match = None
-        min_distance = float('inf')
-        for category, category_items in items.items():
-            for item_name, item_data in category_items.items():
-                distance = self.levenshtein_distance(query, item_name.lower())
-                if distance < min_distance:
-                    min_distance = distance
-                    best_match = (category, item_name, item_data)
-        return best_match
+        # Validators and parsed item names of every wiki page, so unchanged pages are neither downloaded nor parsed
+        # again, and the time of the last refresh, so a restart does not refresh early
+        try:
+            state = load_json(self.pages_file_path)
+        except (FileNotFoundError, ValueError):
+            state = {}
+        self.pages = state.get("pages", {})
+        self.last_updated = datetime.fromtimestamp(state["last_updated"]) if state.get("last_updated") else None
+        self.refresh_interval = timedelta(hours=1)
+        self.refresh_task = None
+
+        # Search indexes over all OP items and per category, rebuilt once per published snapshot
+        self.search_indexes = {}
+        self.search_version = None
+
+    async def cog_load(self):
+        """Start the background refresh when the cog is loaded."""
+        self.refresh_loop.start()
+
+    async def cog_unload(self):
+        """Stop the background refresh when the cog is unloaded."""
+        self.refresh_loop.cancel()
+
+    @tasks.loop(minutes=5)
+    async def refresh_loop(self):
+        """Refresh the OP items in the background whenever the last refresh is older than the refresh interval."""
+        if self.is_stale():
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep the loop running; the snapshot stays as it was until the next attempt
+                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                print(f"[{current_time}] OP item refresh failed: {e}")
+
+    def is_stale(self) -> bool:
+        """Return True if the OP items were never refreshed or the last refresh is older than the refresh interval."""
+        return self.last_updated is None or datetime.now() - self.last_updated > self.refresh_interval
+
+    async def refresh(self):
+        """Refresh the OP items, joining a refresh that is already running instead of starting a second one."""
+        if self.refresh_task is None:
+            self.refresh_task = asyncio.ensure_future(self.update_json_with_prices())
+            self.refresh_task.add_done_callback(lambda _: setattr(self, "refresh_task", None))
+        await asyncio.shield(self.refresh_task)
+
+    async def download_page(self, url, semaphore):
+        """
+        Download and parse a wiki page unless it is unchanged since the last download.
+
+        Args:
+            url (str): The wiki page.
+            semaphore (asyncio.Semaphore): Bounds the number of concurrent downloads.
+
+        Returns:
+            str: PAGE_CHANGED if `self.pages[url]` was updated, PAGE_UNCHANGED on 304 Not Modified, PAGE_FAILED on a
+            network error or any other status.
+        """
+        page = self.pages.get(url, {})
+        headers = {}
+        if "items" in page:
+            if page.get("etag"):
+                headers["If-None-Match"] = page["etag"]
+            if page.get("last_modified"):
+                headers["If-Modified-Since"] = page["last_modified"]
+
+        try:
+            async with semaphore:
+                response = await self.bot.http_client.get(url, headers=headers)
+        except Exception as e:
+            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"[{current_time}] Failed to download {url}: {e}")
+            return PAGE_FAILED
+
+        if response.status == 304:
+            return PAGE_UNCHANGED
+        if response.status != 200:
+            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"[{current_time}] Failed to download {url}: status {response.status}")
+            return PAGE_FAILED
+        self.pages[url] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "items": await asyncio.to_thread(parse_item_names, response.text())
+        }
+        return PAGE_CHANGED
+
+    def item_names(self, item_name: str) -> tuple[str, ...]:
+        """Return the names an item can be searched by: its display name, and with umlauts folded and spelled out."""
+        display_name = self.format_item_name(item_name)
+        spelled_out = display_name.replace("ä", "ae").replace("ö", "oe").replace("ü", "ue").replace("ß", "ss")
+        return tuple(dict.fromkeys((display_name, normalize_string(display_name), spelled_out)))
+
+    def get_search_index(self, category: str | None = None) -> SearchIndex | None:
+        """
+        Return the search index over all OP items or over one category, rebuilt when a new snapshot was published.
+
+        Args:
+            category (str | None): The encoded category key, or None for all categories.
+
+        Returns:
+            SearchIndex | None: Index with (category, item file name) keys, or None if the category does not exist.
+        """
+        version = self.bot.store.versions.get("op_items")
+        if self.search_version != version:
+            items = self.bot.store.get("op_items")
+            entries = {category_key: {(category_key, item_name): self.item_names(item_name) for item_name in category_items}
+                       for category_key, category_items in items.items()}
+            self.search_indexes = {category_key: SearchIndex(category_entries) for category_key, category_entries in entries.items()}
+            self.search_indexes[None] = SearchIndex({key: names for category_entries in entries.values() for key, names in category_entries.items()})
+            self.search_version = version
+        return self.search_indexes.get(category)
+
+    def find_category(self, value: str) -> str | None:
+        """Return the encoded category key matching a category name as typed or chosen, or None."""
+        wanted = normalize_string(value.strip())
+        for category in self.bot.store.get("op_items"):
+            if wanted in (normalize_string(category), normalize_string(urllib.parse.unquote(category))):
+                return category
+        return None
+
+    async def find_matches(self, query, category=None, limit=5):
+        """
+        Find the best matching items for a query, best first.
+
+        Args:
+            query (str): The item name as typed.
+            category (str | None): The encoded category key to search in, or None for all categories.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list[tuple]: Up to limit (category, item file name, item data) tuples.
+        """
+        index = self.get_search_index(category)
+        if index is None:
+            return []
+        items = self.bot.store.get("op_items")
+        return [(category_key, item_name, items[category_key][item_name])
+                for category_key, item_name in index.search(query, limit)]
 
     def load_existing_prices(self):
-        """Load existing prices from the JSON file if it exists."""
-        if os.path.exists(self.json_file_path):
-            with open(self.json_file_path, 'r') as f:
-                return json.load(f)
-        return {}
+        """Load existing prices from the shared snapshot store."""
+        return self.bot.store.get("op_items")
 
     def get_price_from_existing_data(self, item_name, existing_data):
         """Get the price from existing data if available."""
@@ -79,76 +223,86 @@ class DataFetcher(commands.Cog):
         decoded_name = urllib.parse.unquote(name_without_extension)  # Decode the URL-encoded string
         return decoded_name.replace('_', ' ').title()  # Replace underscores and capitalize words
 
-    async def update_json_with_prices(self, interaction):
-        # Check if the last update was more than an hour ago
-        if not hasattr(self, 'last_updated') or datetime.now() - self.last_updated > timedelta(hours=1):
-            urls = [
-                "https://wiki.opsucht.net/op/spitzhacken/",
-                "https://wiki.opsucht.net/op/schwerter/",
-                "https://wiki.opsucht.net/op/aexte/",
-                "https://wiki.opsucht.net/op/schaufeln/",
-                "https://wiki.opsucht.net/op/hacken/",
-                "https://wiki.opsucht.net/op/ruestungen/",
-                "https://wiki.opsucht.net/op/schilde/",
-                "https://wiki.opsucht.net/op/boegen/",
-                "https://wiki.opsucht.net/op/armbrueste/",
-                "https://wiki.opsucht.net/op/angeln/",
-                "https://wiki.opsucht.net/op/talismane/",
-                "https://wiki.opsucht.net/op/fluegel/",
-                "https://wiki.opsucht.net/op/plueschtiere/",
-                "https://wiki.opsucht.net/op/sonstiges/"
-            ]
-
-            items_data = {}
-            existing_data = self.load_existing_prices()
-
-            # Download and parse data from each URL
-            for url in urls:
-                category = url.split('/')[-2]
-                # Replace "ue", "oe", "ae" with "ü", "ö", "ä"
-                category = category.replace("ue", "ü").replace("oe", "ö").replace("ae", "ä")
-                # Encode the category
-                encoded_category = urllib.parse.quote(category)
-
-                soup = await self.download_data(url)
-                if soup:
-                    items_data.setdefault(encoded_category, {})  # Ensure the encoded category exists in the dictionary
-                    for img in soup.find_all("img"):
-                        src = img.get("src")
-                        if "assets/op" in src:
-                            item_name = src.split("/")[-1]
-                            # Check existing data for price
-                            price = self.get_price_from_existing_data(item_name, existing_data)
-                            item_data = {
-                                "price": price
-                            }
-                            items_data[encoded_category][item_name] = item_data
-
-            # Save updated data to JSON file
-            with open(self.json_file_path, 'w') as f:
-                json.dump(items_data, f, indent=4)
-
-            # Log the update
-            self.last_updated = datetime.now()  # Update last_updated variable
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"[{current_time}] Updated {self.json_file_path}")
+    async def save_state(self):
+        """Persist the page validators and the time of the last refresh."""
+        await write_json(self.pages_file_path, {"last_updated": self.last_updated.timestamp(), "pages": self.pages})
+
+    async def update_json_with_prices(self):
+        """Download the wiki pages and rebuild the OP items from the ones that changed. Use `refresh()` to call it."""
+        start = datetime.now()
+
+        # Download all pages concurrently; pages answering 304 Not Modified keep their parsed items
+        semaphore = asyncio.Semaphore(self.config.get('wiki_concurrency', 4))
+        outcomes = await asyncio.gather(*(self.download_page(url, semaphore) for url in WIKI_URLS))
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        # If the wiki did not answer at all, keep last_updated so the refresh loop tries again on its next run
+        if all(outcome == PAGE_FAILED for outcome in outcomes):
+            print(f"[{current_time}] All wiki pages failed to download, kept {self.json_file_path} ({(datetime.now() - start).total_seconds():.2f}s)")
+            return
+
+        self.last_updated = datetime.now()  # Update last_updated variable
+        changed = outcomes.count(PAGE_CHANGED)
+        if not changed and self.bot.store.get("op_items"):
+            await self.save_state()
+            print(f"[{current_time}] Wiki pages unchanged, kept {self.json_file_path} ({(self.last_updated - start).total_seconds():.2f}s)")
+            return
+
+        items_data = {}
+        existing_data = self.load_existing_prices()
+
+        # Rebuild the categories from the parsed pages
+        for url in WIKI_URLS:
+            if "items" not in self.pages.get(url, {}):
+                continue
+            category = url.split('/')[-2]
+            # Replace "ue", "oe", "ae" with "ü", "ö", "ä"
+            category = category.replace("ue", "ü").replace("oe", "ö").replace("ae", "ä")
+            # Encode the category
+            encoded_category = urllib.parse.quote(category)
+
+            items_data.setdefault(encoded_category, {})  # Ensure the encoded category exists in the dictionary
+            for item_name in self.pages[url]["items"]:
+                # Check existing data for price
+                price = self.get_price_from_existing_data(item_name, existing_data)
+                item_data = {
+                    "price": price
+                }
+                items_data[encoded_category][item_name] = item_data
+
+        # Save updated data, the page validators and the refresh time to JSON files
+        await write_json(self.json_file_path, items_data)
+        await self.save_state()
+        self.bot.store.publish(op_items=items_data)
+
+        # Log the update
+        print(f"[{current_time}] Updated {self.json_file_path} from {changed} changed pages ({(self.last_updated - start).total_seconds():.2f}s)")
 
     @app_commands.command(name="op_items", description="Get the price for an op-item")
-    @app_commands.describe(query="The name of the item to search for")
-    async def fetch_items(self, interaction: discord.Interaction, query: str):
+    @app_commands.describe(query="The name of the item to search for", category="Only search this category")
+    async def fetch_items(self, interaction: discord.Interaction, query: str, category: str | None = None):
         await interaction.response.defer()  # Acknowledge the command before doing long operations
 
-        await self.update_json_with_prices(interaction)
+        # Serve the current snapshot; only wait for a refresh if there is no data at all
+        items_data = self.bot.store.get("op_items")
+        if not items_data:
+            await self.refresh()
+            items_data = self.bot.store.get("op_items")
+        elif self.is_stale():
+            # The background refresh is late, so revalidate without making the user wait
+            self.bot.loop.create_task(self.refresh_loop())
 
-        # Load updated items data
-        with open(self.json_file_path, 'r') as f:
-            items_data = json.load(f)
+        category_key = None
+        if category:
+            category_key = self.find_category(category)
+            if category_key is None:
+                await interaction.followup.send(f"Unknown category: {category}")
+                return
 
-        # Fuzzy find the best match
-        encoded_query = urllib.parse.quote(query)
-        best_match = await self.find_best_match(encoded_query, items_data)
-        if best_match:
-            category, item_name, item_data = best_match
+        # Look up the best matches in the search index
+        matches = await self.find_matches(query, category_key, 5)
+        if matches:
+            category, item_name, item_data = matches[0]
             formatted_item_name = self.format_item_name(item_name)
 
             decoded_category = urllib.parse.unquote(category)
@@ -160,6 +314,10 @@ class DataFetcher(commands.Cog):
             lore_image_url = f"https://wiki.opsucht.net/assets/op/lore/{category}/{item_name}"
             embed.set_thumbnail(url=item_image_url)
             embed.set_image(url=lore_image_url)
+            if len(matches) > 1:
+                embed.add_field(name="Weitere Treffer",
+                                value="\n".join(self.format_item_name(other_name) for _, other_name, _ in matches[1:]),
+                                inline=False)
             embed.color = self.embed_color
             embed.set_footer(text=f"{self.config['name']} • JinglingJester")
 
@@ -167,5 +325,25 @@ class DataFetcher(commands.Cog):
         else:
             await interaction.followup.send("No items found matching your query.")
 
+    @fetch_items.autocomplete('query')
+    async def query_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Autocompletes the query field with the 25 best matching item names, within the chosen category if any."""
+        category = getattr(interaction.namespace, "category", None)
+        index = self.get_search_index(self.find_category(category) if category else None) or self.get_search_index()
+        choices = []
+        for (category_key, item_name), _ in index.suggest(current, 25):
+            name = self.format_item_name(item_name)
+            label = f"{name} ({urllib.parse.unquote(category_key).title()})"
+            choices.append(app_commands.Choice(name=label[:100], value=name[:100]))
+        return choices
+
+    @fetch_items.autocomplete('category')
+    async def category_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Autocompletes the category field with the wiki categories containing the typed text."""
+        current = normalize_string(current)
+        categories = [urllib.parse.unquote(category) for category in self.bot.store.get("op_items")]
+        return [app_commands.Choice(name=category.title(), value=category)
+                for category in categories if current in normalize_string(category)][:25]
+
 async def setup(bot):
     await bot.add_cog(DataFetcher(bot))
@@ -6,15 +6,17 @@ import time
 import base64
 from discord import app_commands
 from discord.ext import commands
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import matplotlib.ticker as ticker
 from datetime import datetime, timedelta
 import pandas as pd
 import io
+from collections import Counter
 from datetime import datetime as dt
-import requests
 from discord import File
+from utils.cache import LRUCache
+from utils.graphs import GraphRenderer
+from utils.search import SearchIndex
+from utils.matrix import MarketStats
+from utils.prices import PriceRecord
 
 # Retrieve the current file path and name
 current_file_path = __file__
@@ -51,6 +53,58 @@ class MarketCog(commands.Cog):
             self.config = json.load(f)
         self.embed_color = int(self.config['embed_hex'], 16)
 
+        # Rendered graph PNGs keyed by (material, display name, days, history version)
+        self.graph_cache = LRUCache(self.config.get('graph_cache_bytes', 32 * 1024 * 1024), sizeof=len)
+        self.graph_requests = Counter()
+
+        # Item search index, rebuilt once per published items snapshot
+        self.search_index = None
+        self.search_version = None
+
+    async def cog_load(self):
+        """Start the graph render pool and subscribe to snapshot store updates when the cog is loaded."""
+        self.renderer = GraphRenderer(workers=self.config.get('graph_workers', 2),
+                                      max_queue=self.config.get('graph_queue', 8),
+                                      timeout=self.config.get('graph_timeout', 10))
+        self.bot.store.subscribe(self.on_store_update)
+
+    async def cog_unload(self):
+        """Unsubscribe from snapshot store updates and stop the graph render pool when the cog is unloaded."""
+        self.bot.store.unsubscribe(self.on_store_update)
+        self.renderer.close()
+
+    def on_store_update(self, datasets: set[str]):
+        """Drop cached graphs once new price history landed and re-render the most requested ones."""
+        if "history" in datasets:
+            self.graph_cache.clear()
+            self.bot.loop.create_task(self.prewarm_graphs())
+
+    async def prewarm_graphs(self):
+        """Render the default graphs of the most requested items into the cache."""
+        for (item_name_eng, display_name), _ in self.graph_requests.most_common(self.config.get('graph_prewarm', 10)):
+            await self.get_price_history_graph(item_name_eng, display_name, 14)
+
+    async def get_price_history_graph(self, item_name_eng: str, display_name: str, days: int) -> bytes | None:
+        """
+        Return the rendered price history graph as PNG bytes, from the cache if it is still current.
+
+        Args:
+            item_name_eng (str): The English name of the item.
+            display_name (str): The name shown in the graph title.
+            days (int): The number of days shown in the graph.
+
+        Returns:
+            bytes | None: The PNG image, or None if the render pool could not produce it in time.
+        """
+        key = (item_name_eng, display_name, days, self.bot.store.versions.get("history", 0))
+        graph = self.graph_cache.get(key)
+        if graph is None:
+            history = await self.bot.history.read_daily(item_name_eng, datetime.now().date() - timedelta(days=days - 1))
+            graph = await self.renderer.render(self.format_item_name(display_name), history, days)
+            if graph is not None:
+                self.graph_cache.put(key, graph)
+        return graph
+
     def load_api_credentials(self):
         """Load API credentials from 'api.json'."""
         with open("api.json", "r") as f:
@@ -67,41 +121,21 @@ class MarketCog(commands.Cog):
             "User-Agent": f"{self.api_uname}"
         }
 
-    def levenshtein_distance(self, s1: str, s2: str) -> int:
-        """
-        Calculate the Levenshtein distance between two strings.
-        
-        Args:
-            s1 (str): First string.
-            s2 (str): Second string.
-        
-        Returns:
-            int: The Levenshtein distance between the two strings.
-        """
-        if len(s1) < len(s2):
-            return self.levenshtein_distance(s2, s1)
-
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-        
-        return previous_row[-1]
+    def get_search_index(self) -> SearchIndex:
+        """Return the item search index, rebuilding it when a new items snapshot was published."""
+        items = self.bot.store.get("items")
+        version = self.bot.store.versions.get("items")
+        if self.search_index is None or self.search_version != version:
+            self.search_index = SearchIndex({eng_name: (ger_name, eng_name) for eng_name, ger_name in items.items()})
+            self.search_version = version
+        return self.search_index
 
     def find_best_match(self, query: str, items_dict: dict) -> tuple[str, str]:
         """
         Find the best matching item from a dictionary of English and German names based on the query string.
 
-        First, it tries to find a substring match, and if multiple matches are found, it uses fuzzy matching to select the best one.
-        If no substring matches are found, it falls back to full fuzzy matching.
+        Items containing the query as a substring win over all others; among them, and in the fallback to full fuzzy
+        matching, the smallest Levenshtein distance to the English or German name decides.
 
         Args:
             query (str): Query string to match.
@@ -110,187 +144,53 @@ class MarketCog(commands.Cog):
         Returns:
             tuple: The best matching English and German item names.
         """
-        query = query.lower()
-
-        # First, perform a substring search on both English and German names
-        substring_matches = [(eng_name, ger_name) for eng_name, ger_name in items_dict.items()
-                            if query in eng_name.lower() or query in ger_name.lower()]
-
-        # If we have substring matches, use fuzzy matching to sort them
-        if substring_matches:
-            closest_match_eng = None
-            closest_match_ger = None
-            lowest_distance = float('inf')
-
-            for eng_name, ger_name in substring_matches:
-                distance_eng = self.levenshtein_distance(query, eng_name.lower())
-                distance_ger = self.levenshtein_distance(query, ger_name.lower())
-
-                # Prioritize the closest match between English and German
-                if distance_eng < lowest_distance:
-                    closest_match_eng = eng_name
-                    closest_match_ger = ger_name
-                    lowest_distance = distance_eng
-                if distance_ger < lowest_distance:
-                    closest_match_eng = eng_name
-                    closest_match_ger = ger_name
-                    lowest_distance = distance_ger
-
-            return closest_match_eng, closest_match_ger
-
-        # If no substring matches, fall back to full fuzzy matching
-        closest_match_eng = None
-        closest_match_ger = None
-        lowest_distance = float('inf')
-
-        for eng_name, ger_name in items_dict.items():
-            distance_eng = self.levenshtein_distance(query, eng_name.lower())
-            distance_ger = self.levenshtein_distance(query, ger_name.lower())
-
-            # Prioritize the closest match between English and German
-            if distance_eng < distance_ger:
-                if distance_eng < lowest_distance:
-                    closest_match_eng = eng_name
-                    closest_match_ger = ger_name
-                    lowest_distance = distance_eng
-            else:
-                if distance_ger < lowest_distance:
-                    closest_match_eng = eng_name
-                    closest_match_ger = ger_name
-                    lowest_distance = distance_ger
-
-        return closest_match_eng, closest_match_ger
-
-    def generate_price_history_graph(self, item_name_eng: str, item_name_display: str, prices_dir: str) -> io.BytesIO:
-        """
-        Generate a graph showing the price history for the given item over the last 14 days.
-
-        Args:
-            item_name_eng (str): The English name of the item for looking up prices.
-            item_name_display (str): The name of the item (English or German) to display in the graph.
-            prices_dir (str): The directory containing the daily price JSON files.
-
-        Returns:
-            io.BytesIO: The graph image as a file-like object.
-        """
-        # Prepare to collect price data
-        buy_prices = {}
-        sell_prices = {}
-
-        # Get the date for the current day and the date for 14 days ago
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=13)  # Adjust to include the last 14 days
-
-        # Loop through the last 14 days and collect prices
-        current_date = start_date
-        while current_date <= end_date:
-            date_str = current_date.strftime("%d-%m-%Y")
-            price_file = os.path.join(prices_dir, f"{date_str}.json")
-
-            if os.path.exists(price_file):
-                with open(price_file, "r") as f:
-                    daily_prices = json.load(f)
-                    for category, items in daily_prices.items():
-                        if item_name_eng in items:
-                            for price_info in items[item_name_eng]:
-                                if price_info['orderSide'] == 'BUY':
-                                    buy_prices[date_str] = price_info['price']
-                                elif price_info['orderSide'] == 'SELL':
-                                    sell_prices[date_str] = price_info['price']
-
-            # Move to the next day
-            current_date += timedelta(days=1)
-
-        # Create a list of all dates in the range
-        dates = [start_date + timedelta(days=i) for i in range(14)]  # Last 14 days
-        dates_str = [date.strftime("%d-%m-%Y") for date in dates]
-
-        # Prepare buy and sell values with default 0 if no price data is available
-        buy_values = [buy_prices.get(date_str, 0) for date_str in dates_str]
-        sell_values = [sell_prices.get(date_str, 0) for date_str in dates_str]
-
-        # Plotting the graph
-        plt.figure(figsize=(12, 6))
-        plt.plot(dates, buy_values, label='Kaufpreis', color='blue', marker='o', linestyle='-')
-        plt.plot(dates, sell_values, label='Verkaufspreis', color='red', marker='o', linestyle='-')
-        plt.xlabel('Datum')
-        plt.ylabel('Preis')
-
-        # Use the appropriate display name for the title
-        formatted_item_name = self.format_item_name(item_name_display)
-        plt.title(f'Preisverlauf für {formatted_item_name}', color='white')
-        plt.legend()
-
-        # Format x-axis to show all dates in the range
-        plt.gca().xaxis.set_major_locator(mdates.DayLocator())
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%d-%m-%Y'))
-        plt.gca().set_xticks(dates)  # Ensure ticks match all dates
-        plt.gcf().autofmt_xdate()  # Automatically format dates on x-axis
-
-        # Format y-axis labels
-        def format_func(value, tick_number):
-            if value >= 1_000_000:
-                return f'{value/1_000_000:.0f}M'
-            elif value >= 1_000:
-                return f'{value/1_000:.0f}K'
-            else:
-                return f'{value:.0f}'
-
-        plt.gca().yaxis.set_major_formatter(ticker.FuncFormatter(format_func))
-
-        # Set the background color to be transparent
-        plt.gcf().patch.set_facecolor('none')
-        plt.gca().set_facecolor('none')
-        plt.gca().spines['top'].set_visible(False)
-        plt.gca().spines['right'].set_visible(False)
-        plt.gca().spines['left'].set_color('white')
-        plt.gca().spines['bottom'].set_color('white')
-        plt.gca().yaxis.label.set_color('white')
-        plt.gca().xaxis.label.set_color('white')
-        plt.gca().tick_params(axis='both', colors='white')
-        plt.grid(True, linestyle='--', alpha=0.5, color='white')
-
-        # Save the plot to a BytesIO object
-        image_stream = io.BytesIO()
-        plt.savefig(image_stream, format='png', bbox_inches='tight', transparent=True)
-        image_stream.seek(0)
-        plt.close()
-
-        return image_stream
+        matches = self.get_search_index().search(query, 1)
+        if not matches:
+            return None, None
+        return matches[0], items_dict[matches[0]]
 
     def format_item_name(self, item_name: str) -> str:
         """Format item names for display, capitalizing each word."""
         return ' '.join(word.capitalize() for word in item_name.split('_'))
 
-    def get_item_image_url(self, item_name: str) -> str:
-        """Get the item image URL from the local directory, API, or fallback image."""
-        formatted_name = item_name.lower().replace(' ', '_')
-        local_image_path = f"data/items/minecraft_{formatted_name}.png"
-        fallback_image = "data/imagenotfound.png"
-        
-        # Check if the image exists locally
-        if os.path.exists(local_image_path):
-            return local_image_path  # Return the local path for sending as a file
-
-        # Try to get the image from the API if it doesn't exist locally
-        url = f"https://img.mc-api.io/{formatted_name}.png"
-        try:
-            response = requests.get(url)
-            if response.status_code == 200 and 'image' in response.headers['Content-Type']:
-                return url  # Return the URL for the embed thumbnail
-        except requests.RequestException:
-            pass  # Fallback if any exception occurs
-
-        # If all fails, return the fallback image
-        return fallback_image  # Return fallback local path
-
     def format_price(self, price: int) -> str:
         """Format price with thousand separators."""
         return f"{price:,}".replace(",", ".") + " Coins"
 
+    def format_stat(self, value: float | None, unit: str = " Coins", signed: bool = False) -> str:
+        """Format a derived statistic with German separators, one decimal and a unit (Coins by default); a dash if it is missing."""
+        if value is None:
+            return "–"
+        text = f"{value:{'+' if signed else ''},.1f}"
+        return text.replace(",", "#").replace(".", ",").replace("#", ".") + unit
+
+    def add_stats_fields(self, embed: discord.Embed, stats: MarketStats, record: PriceRecord | None):
+        """
+        Add the precomputed moving averages, volatility and order depth of an item to its embed.
+
+        Args:
+            embed (discord.Embed): The /price embed.
+            stats (MarketStats): The item's statistics from the "market_stats" dataset.
+            record (PriceRecord | None): The item's current prices and order counts.
+        """
+        def per_side(buy: str, sell: str) -> str:
+            return f"Kauf: {buy}\nVerkauf: {sell}"
+
+        def depth(orders: int | None, trend: float | None) -> str:
+            return f"{orders if orders is not None else '–'} ({self.format_stat(trend, '/Tag', signed=True)})"
+
+        embed.add_field(name="Ø 7 Tage", value=per_side(self.format_stat(stats.buy.average_7),
+                                                        self.format_stat(stats.sell.average_7)), inline=True)
+        embed.add_field(name="Ø 14 Tage", value=per_side(self.format_stat(stats.buy.average_14),
+                                                         self.format_stat(stats.sell.average_14)), inline=True)
+        embed.add_field(name="Volatilität (14 Tage)", value=per_side(self.format_stat(stats.buy.volatility, " %"),
+                                                                     self.format_stat(stats.sell.volatility, " %")), inline=True)
+        embed.add_field(name="Ordertiefe (Trend)", value=per_side(depth(record and record.buy_orders, stats.buy.orders_trend),
+                                                                  depth(record and record.sell_orders, stats.sell.orders_trend)), inline=True)
+
     async def get_price(self, item_name: str) -> dict[str, int]:
         """
-        Get the buy and sell prices for a specific item from the local 'prices.json' file.
+        Get the buy and sell prices for a specific item from the shared price index.
         
         Args:
             item_name (str): The item name to search for prices.
@@ -298,30 +198,28 @@ class MarketCog(commands.Cog):
         Returns:
             dict[str, int]: A dictionary containing buy and sell prices.
         """
-        try:
-            with open(self.prices_file, "r") as f:
-                prices_data = json.load(f)
-            for category, items in prices_data.items():
-                if item_name in items:
-                    return items[item_name]
-        except FileNotFoundError:
+        record = self.bot.store.get("price_index").get(item_name)
+        if not record:
             return {"buy": 0, "sell": 0}
+        return {"buy": record.buy, "sell": record.sell}
 
     @app_commands.command(name="price", description="Get the price for an item")
-    async def fetch_price(self, interaction: discord.Interaction, item_name: str):
+    @app_commands.describe(days="Number of days shown in the price history (1-365)")
+    async def fetch_price(self, interaction: discord.Interaction, item_name: str, days: app_commands.Range[int, 1, 365] = 14):
         """
         Command to fetch and display the price for an item.
         
         Args:
             interaction (discord.Interaction): The interaction object for the command.
             item_name (str): The name of the item to fetch the price for.
+            days (int): The number of days shown in the price history graph.
         """
+        # Acknowledge the command first; the icon download and the graph render may take longer than Discord's 3 seconds
+        await interaction.response.defer()
 
-        # Load items and prices data
-        with open(self.items_file, "r") as f:
-            items = json.load(f)
-        with open(self.prices_file, "r") as f:
-            prices = json.load(f)
+        # Get items and the price index from the shared snapshot store
+        items = self.bot.store.get("items")
+        price_index = self.bot.store.get("price_index")
 
         # Find the best match from items list (using substring first, then fuzzy if needed)
         best_match_eng, best_match_ger = self.find_best_match(item_name, items)
@@ -333,22 +231,13 @@ class MarketCog(commands.Cog):
             # Determine the display name based on user query (use German if closer, else English)
             display_name = best_match_ger if item_name.lower() in best_match_ger.lower() else best_match_eng
 
-            item_image_url = self.get_item_image_url(best_match_eng)  # Always use English name for URL lookup
+            item_image_url = await self.bot.images.resolve(best_match_eng)  # Always use English name for the icon lookup
 
             # Find the price using the English name
-            buy_price = None
-            sell_price = None
-            category_found = None
-
-            for category, category_items in prices.items():
-                if best_match_eng in category_items:
-                    category_found = category
-                    for price_info in category_items[best_match_eng]:
-                        if price_info['orderSide'] == 'BUY':
-                            buy_price = price_info['price']
-                        elif price_info['orderSide'] == 'SELL':
-                            sell_price = price_info['price']
-                    break
+            record = price_index.get(best_match_eng)
+            buy_price = record.buy if record else None
+            sell_price = record.sell if record else None
+            category_found = record.category if record else None
 
             # Create the embed
             embed = discord.Embed(title=self.format_item_name(display_name), 
@@ -372,19 +261,39 @@ class MarketCog(commands.Cog):
             embed.add_field(name="Kaufpreis", value=self.format_price(buy_price) if buy_price else "Nicht verfügbar", inline=True)
             embed.add_field(name="Verkaufspreis", value=self.format_price(sell_price) if sell_price else "Nicht verfügbar", inline=True)
 
+            # Add the spread of the current prices; a price of 0 means that side has no orders
+            spread = buy_price - sell_price if buy_price and sell_price else None
+            embed.add_field(name="Spanne", value=self.format_stat(spread), inline=True)
+
+            # Add the statistics precomputed after the last history update
+            stats = self.bot.store.get("market_stats").get(best_match_eng)
+            if stats:
+                self.add_stats_fields(embed, stats, record)
+
             # Generate price history graph and add it to the embed
-            prices_dir = 'data/prices'
-            graph_image = self.generate_price_history_graph(best_match_eng, display_name, prices_dir)
+            self.graph_requests[(best_match_eng, display_name)] += 1
+            graph_image = await self.get_price_history_graph(best_match_eng, display_name, days)
             if graph_image:
-                graph_file = File(graph_image, filename='price_history.png')
+                graph_file = File(io.BytesIO(graph_image), filename='price_history.png')
                 files.append(graph_file)
                 embed.set_image(url="attachment://price_history.png")
             
             # Set footer and send message
             embed.set_footer(text=f"{self.config['name']} • JinglingJester")
-            await interaction.response.send_message(embed=embed, files=files)
+            await interaction.followup.send(embed=embed, files=files)
         else:
-            await interaction.response.send_message("Kein passender Item gefunden.")
+            await interaction.followup.send("Kein passender Item gefunden.")
+
+    @fetch_price.autocomplete('item_name')
+    async def item_name_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Autocompletes the item_name field with the 25 best matching English or German item names."""
+        choices = []
+        for eng_name, name in self.get_search_index().suggest(current, 25):
+            label = self.format_item_name(name)
+            if label.lower() != self.format_item_name(eng_name).lower():
+                label = f"{label} ({self.format_item_name(eng_name)})"
+            choices.append(app_commands.Choice(name=label[:100], value=name[:100]))
+        return choices
 
 async def setup(bot: commands.Bot):
     """Setup function to add the MarketCog to the bot."""
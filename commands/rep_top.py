@@ -0,0 +1,70 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from utils.reputation import ranking
+import json
+
+class RepTop(commands.Cog):
+    """A Discord Cog that shows the Minecraft users with the highest reputation."""
+
+    def __init__(self, bot: commands.Bot):
+        """Initializes the RepTop cog."""
+        self.bot = bot
+        self.config_file = "data/config.json"
+
+        # Load the config file and set embed color
+        with open(self.config_file, "r") as f:
+            self.config = json.load(f)
+        self.embed_color = int(self.config['embed_hex'], 16)
+
+    @app_commands.command(name="rep_top", description="Show the Minecraft users with the highest reputation")
+    @app_commands.describe(page="Page of the leaderboard", scope="Rank the votes of this server or all votes",
+                           order="Show the highest or the lowest reputation first")
+    @app_commands.choices(scope=[
+        app_commands.Choice(name="Server", value="server"),
+        app_commands.Choice(name="Global", value="global")
+    ], order=[
+        app_commands.Choice(name="Top", value="top"),
+        app_commands.Choice(name="Bottom", value="bottom")
+    ])
+    async def rep_top(self, interaction: discord.Interaction, page: app_commands.Range[int, 1, 1000] = 1, scope: str = "server",
+                      order: str = "top"):
+        """
+        A slash command that displays one page of the reputation leaderboard.
+
+        The leaderboard is read from the ranking the database maintains on every vote, so a page costs the same no
+        matter how many votes exist.
+
+        Args:
+            interaction (discord.Interaction): The interaction object that represents the command invocation.
+            page (int): The page to show, ten users per page.
+            scope (str): "server" to rank the votes cast in this server, "global" to rank all votes.
+            order (str): "top" for the highest overall reputation first, "bottom" for the lowest first.
+        """
+        # Outside of a server only the global leaderboard exists
+        guild_id = interaction.guild_id if scope == "server" else None
+        rows = await ranking(self.bot.db, guild_id, page, order=order)
+
+        if not rows:
+            await interaction.response.send_message(
+                "Auf dieser Seite gibt es keine Reputationen." if page > 1 else "Es wurden noch keine Reputationen vergeben.",
+                ephemeral=True,
+                delete_after=5
+            )
+            return
+
+        lines = []
+        for rank, (uuid, username, positive_reps, negative_reps, overall_rep) in enumerate(rows[:10], (page - 1) * 10 + 1):
+            lines.append(f"**{rank}.** {discord.utils.escape_markdown(username or uuid)} — **{overall_rep}** "
+                         f"(+{positive_reps} / {negative_reps})")
+
+        title = "Reputations-Rangliste" if order == "top" else "Schlechteste Reputationen"
+        title = f"__{title}__" if guild_id is None else f"__{title} von {interaction.guild.name}__"
+        embed = discord.Embed(title=title, description="\n".join(lines), color=self.embed_color)
+        footer = f"Seite {page}" + (f" • Weiter mit page:{page + 1}" if len(rows) > 10 else "")
+        embed.set_footer(text=f"{self.config['name']} • {footer}")
+        await interaction.response.send_message(embed=embed)
+
+async def setup(bot: commands.Bot):
+    """Asynchronous setup function to add the RepTop cog to the bot."""
+    await bot.add_cog(RepTop(bot))
@@ -1,7 +1,7 @@
 import discord
-import aiosqlite
 from discord import app_commands
 from discord.ext import commands
+from utils.reputation import totals
 
 class Stats(commands.Cog):
     """A Discord Cog that allows users to check the reputation statistics of a user."""
@@ -21,17 +21,12 @@ class Stats(commands.Cog):
         Sends:
             A message indicating the number of positive and negative reputations the user has given, or a message indicating that the user has not given any reputations.
         """
-        # Connect to the SQLite database
-        async with aiosqlite.connect("data/reputation.db") as db:
-            # Retrieve all reputations given by the user
-            cursor = await db.execute("SELECT reputation FROM reputation WHERE giver_id = ?", (user.id,))
-            reputations = await cursor.fetchall()
+        # Read the maintained totals of the reputations given by the user
+        given = (await totals(self.bot.db, "giver", [user.id])).get(str(user.id))
 
         # Check if the user has given any reputations
-        if reputations:
-            # Calculate the number of positive and negative reputations
-            positive_reps = sum(rep[0] for rep in reputations if rep[0] > 0)
-            negative_reps = sum(rep[0] for rep in reputations if rep[0] < 0)
+        if given:
+            positive_reps, negative_reps, _ = given
             # Send a message with the user's reputation stats
             await interaction.response.send_message(
                 f"**{user.mention}** hat **{positive_reps}** positive und **{negative_reps}** negative Reputationen vergeben."
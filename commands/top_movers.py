@@ -0,0 +1,104 @@
+import discord
+import json
+from discord import app_commands
+from discord.ext import commands
+from utils.history import SIDES
+from utils.matrix import MATRIX_DAYS
+
+# Longest period /top_movers can compare against today
+MAX_DAYS = MATRIX_DAYS - 1
+
+SIDE_LABELS = {SIDES["BUY"]: "Kaufpreis", SIDES["SELL"]: "Verkaufspreis"}
+
+class TopMovers(commands.Cog):
+    """A Discord Cog that shows the items whose prices changed the most."""
+
+    def __init__(self, bot: commands.Bot):
+        """Initializes the TopMovers cog."""
+        self.bot = bot
+        self.config_file = "data/config.json"
+
+        # Load the config file and set embed color
+        with open(self.config_file, "r") as f:
+            self.config = json.load(f)
+        self.embed_color = int(self.config['embed_hex'], 16)
+
+    def categories(self) -> dict[str, set]:
+        """Return category -> materials from the current price index."""
+        categories = {}
+        for material, record in self.bot.store.get("price_index").items():
+            if record.category:
+                categories.setdefault(record.category, set()).add(material)
+        return categories
+
+    def format_change(self, change: float, relative: float, percent: bool) -> str:
+        """Format a price change as signed percentage or signed coins."""
+        if percent:
+            return f"{relative:+.1f} %".replace(".", ",")
+        market = self.bot.get_cog("MarketCog")
+        return market.format_stat(change, signed=True)
+
+    @app_commands.command(name="top_movers", description="Show the items whose prices changed the most")
+    @app_commands.describe(days=f"Compare with the price this many days ago (1-{MAX_DAYS})", category="Only rank items of this category",
+                           side="Rank by buy or sell price", mode="Rank by percentage or absolute change")
+    @app_commands.choices(side=[
+        app_commands.Choice(name="buy", value=SIDES["BUY"]),
+        app_commands.Choice(name="sell", value=SIDES["SELL"])
+    ], mode=[
+        app_commands.Choice(name="percent", value="percent"),
+        app_commands.Choice(name="absolute", value="absolute")
+    ])
+    async def top_movers(self, interaction: discord.Interaction, days: app_commands.Range[int, 1, MAX_DAYS] = 7,
+                         category: str = None, side: int = SIDES["BUY"], mode: str = "percent"):
+        """
+        A slash command that lists the ten items with the largest price change over a period.
+
+        All items are ranked at once on the price matrix published after every history update, so a query costs a few
+        array operations regardless of how many items exist.
+
+        Args:
+            interaction (discord.Interaction): The interaction object that represents the command invocation.
+            days (int): The period in days.
+            category (str): Only rank items of this category, e.g. "Bergbau".
+            side (int): Whether the buy or the sell price is ranked.
+            mode (str): "percent" or "absolute".
+        """
+        materials = None
+        if category:
+            categories = self.categories()
+            match = next((name for name in categories if name.lower() == category.lower()), None)
+            if match is None:
+                await interaction.response.send_message(
+                    f"Unbekannte Kategorie. Verfügbar: {', '.join(sorted(categories))}", ephemeral=True, delete_after=10
+                )
+                return
+            category, materials = match, categories[match]
+
+        percent = mode == "percent"
+        movers = self.bot.store.get("matrix").top_movers(side, days, percent, materials)
+        if not movers:
+            await interaction.response.send_message("Für diesen Zeitraum gibt es noch keine Preisdaten.", ephemeral=True, delete_after=10)
+            return
+
+        market = self.bot.get_cog("MarketCog")
+        items = self.bot.store.get("items")
+        lines = []
+        for rank, (material, past, latest, change, relative) in enumerate(movers, 1):
+            lines.append(f"**{rank}.** {market.format_item_name(items.get(material, material))}: "
+                         f"{market.format_stat(past)} → {market.format_stat(latest)} "
+                         f"(**{self.format_change(change, relative, percent)}**)")
+
+        title = f"__Top Movers: {SIDE_LABELS[side]}, {days} {'Tag' if days == 1 else 'Tage'}__"
+        embed = discord.Embed(title=title, description="\n".join(lines), color=self.embed_color)
+        embed.set_footer(text=f"{self.config['name']} • {category or 'Alle Kategorien'}")
+        await interaction.response.send_message(embed=embed)
+
+    @top_movers.autocomplete('category')
+    async def category_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Autocompletes the category field with the categories of the price index."""
+        return [app_commands.Choice(name=name, value=name)
+                for name in sorted(self.categories()) if current.lower() in name.lower()][:25]
+
+async def setup(bot: commands.Bot):
+    """Asynchronous setup function to add the TopMovers cog to the bot."""
+    await bot.add_cog(TopMovers(bot))
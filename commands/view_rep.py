@@ -1,20 +1,9 @@
 import discord
-import aiosqlite
-import aiohttp
 from discord import app_commands
 from discord.ext import commands
+from utils.reputation import totals
 import json
 
-async def get_minecraft_uuid(username: str) -> str:
-    """Retrieves the UUID of a Minecraft user based on their username."""
-    url = f"https://api.mojang.com/users/profiles/minecraft/{username}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                data = await response.json()
-                return data.get("id")
-    return None
-
 class ViewRep(commands.Cog):
     """A Discord Cog that allows users to view the reputation of a Minecraft user."""
 
@@ -42,7 +31,7 @@ class ViewRep(commands.Cog):
             or a message indicating that the user has no reputations.
         """
         # Retrieve the UUID of the Minecraft user
-        uuid = await get_minecraft_uuid(username)
+        uuid = await self.bot.uuid_resolver.resolve(username)
         if not uuid:
             await interaction.response.send_message(
                 f"Der Benutzername **{username}** existiert nicht in Minecraft.", 
@@ -51,18 +40,12 @@ class ViewRep(commands.Cog):
             )
             return
 
-        # Connect to the SQLite database
-        async with aiosqlite.connect("data/reputation.db") as db:
-            # Retrieve all reputations received by the user
-            cursor = await db.execute("SELECT reputation FROM reputation WHERE receiver_uuid = ?", (uuid,))
-            reputations = await cursor.fetchall()
+        # Read the maintained totals of the reputations received by the user
+        received = (await totals(self.bot.db, "receiver", [uuid])).get(uuid)
 
         # Check if the user has received any reputations
-        if reputations:
-            # Calculate the number of positive and negative reputations
-            positive_reps = sum(rep[0] for rep in reputations if rep[0] > 0)
-            negative_reps = sum(rep[0] for rep in reputations if rep[0] < 0)
-            overall_rep = positive_reps + negative_reps
+        if received:
+            positive_reps, negative_reps, overall_rep = received
 
             # Create an embed to display the reputation statistics
             embed = discord.Embed(title=f"__Reputation von {username}__", color=self.embed_color)
@@ -79,6 +62,45 @@ class ViewRep(commands.Cog):
                 delete_after=5
             )
 
+    @app_commands.command(name="view_reps", description="View the reputation of several Minecraft users")
+    @app_commands.describe(usernames="Up to 25 Minecraft usernames, separated by spaces or commas")
+    async def view_reps(self, interaction: discord.Interaction, usernames: str):
+        """
+        A slash command that retrieves and displays the reputation of several Minecraft users in one embed.
+
+        All names are resolved together, so the ones not known yet share bulk requests to the Mojang API.
+
+        Args:
+            interaction (discord.Interaction): The interaction object that represents the command invocation.
+            usernames (str): The Minecraft usernames to look up, separated by spaces or commas.
+        """
+        # Split the input and drop duplicates while keeping the given order
+        names = list(dict.fromkeys(name for name in usernames.replace(",", " ").split() if name))[:25]
+        if not names:
+            await interaction.response.send_message("Bitte gib mindestens einen Benutzernamen an.", ephemeral=True, delete_after=5)
+            return
+
+        await interaction.response.defer()
+        uuids = await self.bot.uuid_resolver.resolve_many(names)
+        known = [uuid for uuid in uuids.values() if uuid]
+
+        # Read the maintained totals of all resolved users in one query
+        received = await totals(self.bot.db, "receiver", known) if known else {}
+
+        embed = discord.Embed(title="__Reputationen__", color=self.embed_color)
+        for name in names:
+            uuid = uuids[name]
+            if not uuid:
+                value = "Existiert nicht in Minecraft."
+            elif uuid not in received:
+                value = "Keine Reputationen."
+            else:
+                positive_reps, negative_reps, overall_rep = received[uuid]
+                value = f"Positiv: {positive_reps} | Negativ: {negative_reps} | Gesamt: {overall_rep}"
+            embed.add_field(name=name, value=value, inline=False)
+
+        await interaction.followup.send(embed=embed)
+
 async def setup(bot: commands.Bot):
     """Asynchronous setup function to add the ViewRep cog to the bot."""
     await bot.add_cog(ViewRep(bot))
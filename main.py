@@ -2,19 +2,60 @@ import discord
 import asyncio
 import os
 import json
-import aiohttp
 import base64
+import hashlib
+import time
 from discord.ext import commands
-from datetime import datetime as dt, date
-import aiosqlite
-import unicodedata
+from datetime import datetime as dt, date, timedelta
+from utils.translations import TranslationIndex
+from utils.store import SnapshotStore
+from utils.prices import build_price_index, decode_price_index, save_price_index
+from utils.history import PriceHistory
+from utils.matrix import PriceMatrix, MATRIX_DAYS
+from utils.images import ItemImageResolver
+from utils.http import HttpClient
+from utils.mojang import UUIDResolver
+from utils.database import Database
+from utils.alerts import AlertStore
+from utils.persist import run_io, write_json, write_json_bytes
+from utils.reputation import migrate as migrate_reputation_db
 
 # Define bot intents for message content access
 intents = discord.Intents.default()
 intents.message_content = True
 
+class OPMarktBot(commands.Bot):
+    """Bot that releases its shared resources when it shuts down."""
+
+    async def close(self):
+        """Close the Discord connection, then the shared HTTP client and databases."""
+        await super().close()
+        await self.http_client.close()
+        await self.db.close()
+        await self.alerts_db.close()
+        await self.history_db.close()
+
 # Create bot instance with command prefix and intents
-client = commands.Bot(command_prefix="!", intents=intents)
+client = OPMarktBot(command_prefix="!", intents=intents)
+
+# Shared in-memory copy of the data files; cogs read from here instead of parsing JSON per command
+client.store = SnapshotStore({
+    "items": "data/items.json",
+    "prices": "data/prices.json",
+    "op_items": "data/op_items_data.json",
+    "price_index": "data/price_index.json"
+}, decoders={"price_index": decode_price_index})
+
+# Price history keyed by (material, side, timestamp), one long-lived reader and writer connection for all reads
+client.history_db = Database("data/history.db")
+client.history = PriceHistory(client.history_db)
+
+# Reputation database, one long-lived reader and writer connection for all commands
+client.db = Database("data/reputation.db")
+
+# Price alert subscriptions, evaluated after every price update
+client.alerts_db = Database("data/alerts.db")
+client.alerts = AlertStore(client.alerts_db)
 
 # Load configuration from 'data/config.json'
 current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -38,6 +79,19 @@ except FileNotFoundError:
 except json.JSONDecodeError:
     print(f"[{current_time}] Invalid JSON format in {os.path.basename(__file__)}")
 
+# Bot-wide HTTP client; its connection pool is opened in on_ready
+client.http_client = HttpClient(timeout=config.get('http_timeout', 10),
+                                limit_per_host=config.get('http_limit_per_host', 8),
+                                retries=config.get('http_retries', 3))
+
+# Item icons, downloaded once into data/items/
+client.images = ItemImageResolver(client.http_client, "data/items", "data/imagenotfound.png")
+
+# Minecraft username -> UUID resolution backed by the users table
+client.uuid_resolver = UUIDResolver(client.http_client, client.db,
+                                    profile_url=config.get('mojang_profile_url', "https://api.mojang.com/users/profiles/minecraft"),
+                                    bulk_url=config.get('mojang_bulk_url', "https://api.minecraftservices.com/minecraft/profile/lookup/bulk/byname"))
+
 def get_headers():
     """Generate headers for API requests with Basic Auth."""
     auth_str = f"{api['API-UNAME']}:{api['API-KEY']}"
@@ -49,120 +103,162 @@ def get_headers():
 
 async def fetch_api_data(url):
     """Fetch data from the API and return the JSON response."""
-    async with aiohttp.ClientSession(headers=get_headers()) as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                return await response.json()
-            else:
-                current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
-                print(f"[{current_time}] Failed to fetch data from {url}: {response.status}")
-                return None
+    response = await client.http_client.get(url, headers=get_headers())
+    if response.status == 200:
+        return response.json()
+    else:
+        current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[{current_time}] Failed to fetch data from {url}: {response.status}")
+        return None
 
 def format_item_name(item_name: str) -> str:
     """Convert item names from UPPERCASE_UNDERSCORE format to Title Case format for translation lookup."""
     # Replace underscores with spaces and convert to title case
     return item_name.replace('_', ' ').title()
 
-def normalize_string(s: str) -> str:
-    """Normalize strings by removing accents and special characters for comparison."""
-    return unicodedata.normalize('NFKD', s).encode('ascii', 'ignore').decode('utf-8').lower()
+# Normalized English name -> German name, rebuilt only when data/translations.json changes
+translation_index = TranslationIndex("data/translations.json")
 
+# Content hash and ETag of the last processed market payloads, so unchanged payloads are not processed again
+market_payloads = {"items": {"hash": None, "etag": None}, "prices": {"hash": None, "etag": None}}
 
-async def fetch_market_data():
-    """Fetch market data from the API and save it to items.json (with translations) and prices.json."""
+async def fetch_market_payload(name: str, url: str):
+    """
+    Fetch one market endpoint, conditionally if it sent an ETag before.
+
+    Args:
+        name (str): The payload name in `market_payloads`.
+        url (str): The endpoint URL.
+
+    Returns:
+        tuple: (response, content hash), or (None, None) if the endpoint answered 304 Not Modified.
+    """
     headers = get_headers()
+    if market_payloads[name]["etag"]:
+        headers["If-None-Match"] = market_payloads[name]["etag"]
+    response = await client.http_client.get(url, headers=headers)
+    if response.status == 304:
+        return None, None
+    if response.status != 200:
+        raise RuntimeError(f"{url} answered {response.status}")
+    return response, hashlib.sha256(response.body).hexdigest()
 
-    # Load translations from data/translations.json
-    with open("data/translations.json", "r", encoding='utf-8') as f:
-        translations = json.load(f)
-    
-    async with aiohttp.ClientSession() as session:
-        try:
-            # Fetch items data
-            async with session.get("https://api.opsucht.net/market/items", headers=headers) as response:
-                items_data = await response.json()
-                
-                # Create a dictionary of translated materials using translations.json
-                translated_materials = {}
-                for item in items_data:
-                    english_name = item["material"]  # Original name in UPPERCASE_UNDERSCORE format
-                    formatted_name = format_item_name(english_name)  # Convert to Title Case with spaces
-                    
-                    # Normalize both the formatted name and translation keys for comparison
-                    normalized_formatted_name = normalize_string(formatted_name)
-                    
-                    # Try to find a translation by matching normalized strings
-                    german_name = None
-                    for key, value in translations.items():
-                        if normalize_string(key) == normalized_formatted_name:
-                            german_name = value
-                            break
-                    
-                    if german_name:
-                        # Use the German name if found in translations.json
-                        translated_materials[english_name] = german_name
-                    else:
-                        # Default to English name if no German translation exists
-                        #print(f"No German translation for: {english_name}")
-                        translated_materials[english_name] = english_name
-                
-                # Save the translated materials to items.json
-                with open("data/items.json", "w", encoding='utf-8') as f:
-                    json.dump(translated_materials, f, indent=4, ensure_ascii=False)
-                print(f"[{dt.now().strftime('%Y-%m-%d %H:%M:%S')}] Saved translated materials to data/items.json")
-            
-            # Fetch prices data
-            async with session.get("https://api.opsucht.net/market/prices", headers=headers) as response:
-                prices_data = await response.json()
-                
-                # Save the prices data to prices.json
-                with open("data/prices.json", "w", encoding='utf-8') as f:
-                    json.dump(prices_data, f, indent=4, ensure_ascii=False)
-                print(f"[{dt.now().strftime('%Y-%m-%d %H:%M:%S')}] Saved prices to data/prices.json")
-                
-            return prices_data
+def translate_materials(materials: list[str]) -> dict[str, str]:
+    """Map English material names to their German names, falling back to the English name."""
+    translated_materials = {}
+    for english_name in materials:
+        formatted_name = format_item_name(english_name)  # Convert to Title Case with spaces
 
-        except Exception as e:
-            print(f"[{dt.now().strftime('%Y-%m-%d %H:%M:%S')}] Error fetching market data: {e}")
-            return None
+        # Look up the translation by its normalized name, defaulting to the English name
+        translated_materials[english_name] = translation_index.lookup(formatted_name) or english_name
+    return translated_materials
 
-async def save_daily_prices():
-    """Save the current day's prices to a file named with the current date."""
-    today = date.today().strftime("%d-%m-%Y")
-    daily_prices_file = f"data/prices/{today}.json"
+async def fetch_market_data():
+    """
+    Fetch market data from the API and update items.json (with translations), prices.json and the snapshot store.
 
-    # Ensure the directory exists
-    os.makedirs(os.path.dirname(daily_prices_file), exist_ok=True)
+    Both endpoints are fetched concurrently. A payload whose content hash did not change since the last refresh (or
+    that answered 304) is neither translated, parsed nor written again. The parsed prices are shared by the snapshot
+    store and the price history, and prices.json is written from the received bytes instead of being serialized again.
 
-    # Fetch and save today's prices to the daily file
+    Returns:
+        dict | None: The current prices payload, or None if the refresh failed.
+    """
+    timings = {}
+    start = time.perf_counter()
+    current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    try:
+        # Stage 1: fetch both endpoints at once
+        (items_response, items_hash), (prices_response, prices_hash) = await asyncio.gather(
+            fetch_market_payload("items", "https://api.opsucht.net/market/items"),
+            fetch_market_payload("prices", "https://api.opsucht.net/market/prices")
+        )
+        timings["fetch"] = time.perf_counter() - start
+        published = {}
+
+        # Stage 2: translate the item list if it or data/translations.json changed
+        stage = time.perf_counter()
+        translations_changed = translation_index.refresh()
+        if translations_changed:
+            print(f"[{current_time}] Built translation index with {len(translation_index.index)} entries")
+        items_changed = items_response is not None and items_hash != market_payloads["items"]["hash"]
+        if items_changed or translations_changed or not client.store.get("items"):
+            materials = [item["material"] for item in items_response.json()] if items_response is not None else list(client.store.get("items"))
+            published["items"] = translate_materials(materials)
+            await write_json("data/items.json", published["items"])
+        timings["items"] = time.perf_counter() - stage
+
+        # Stage 3: parse the prices once for the snapshot, the price index and the history
+        stage = time.perf_counter()
+        prices_changed = prices_response is not None and prices_hash != market_payloads["prices"]["hash"]
+        if prices_changed or not client.store.get("prices"):
+            if prices_response is None:
+                raise RuntimeError("prices answered 304 without prices being loaded")
+            published["prices"] = prices_response.json()
+            published["price_index"] = build_price_index(published["prices"])
+            await write_json_bytes("data/prices.json", prices_response.body)  # Saved as received, without serializing again
+            await run_io(save_price_index, published["price_index"], "data/price_index.json")
+        timings["prices"] = time.perf_counter() - stage
+
+        # Swap the new data into the shared snapshot store
+        if published:
+            client.store.publish(**published)
+
+        # Remember what was processed, only after it was saved and published
+        for name, response, digest in (("items", items_response, items_hash), ("prices", prices_response, prices_hash)):
+            if response is not None:
+                market_payloads[name] = {"hash": digest, "etag": response.headers.get("ETag")}
+
+        print(f"[{current_time}] Market refresh: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items())
+              + f" (updated: {', '.join(published) or 'nothing'})")
+        return client.store.get("prices")
+
+    except Exception as e:
+        print(f"[{current_time}] Error fetching market data: {e}")
+        return None
+
+async def build_market_stats() -> dict:
+    """
+    Build the price matrix of the last MATRIX_DAYS days and the per-item statistics derived from it.
+
+    Returns:
+        dict: The "matrix" and "market_stats" datasets, ready to be published.
+    """
+    today = date.today()
+    rows = await client.history.read_daily_all(today - timedelta(days=MATRIX_DAYS - 1))
+    matrix = await asyncio.to_thread(PriceMatrix, rows, today, MATRIX_DAYS)
+    return {"matrix": matrix, "market_stats": await asyncio.to_thread(matrix.stats)}
+
+async def save_price_history():
+    """Save the current prices as a new sample in the price history store."""
     current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
     prices_data = await fetch_market_data()
 
     if prices_data:
         try:
-            with open(daily_prices_file, "w") as f:
-                json.dump(prices_data, f, indent=4)
-            print(f"[{current_time}] Saved daily prices to {daily_prices_file}")
+            start = time.perf_counter()
+            timestamp = dt.now().timestamp()
+            await client.history.record(prices_data, timestamp)
+            # Lets the cogs know new history landed, together with the matrix and statistics derived from it
+            client.store.publish(history=int(timestamp), **await build_market_stats())
+            print(f"[{current_time}] Saved prices to {client.history_db.path} ({(time.perf_counter() - start) * 1000:.0f} ms)")
         except Exception as e:
-            print(f"[{current_time}] Error saving daily prices: {e}")
+            print(f"[{current_time}] Error saving prices: {e}")
 
-async def cleanup_old_files():
-    """Delete files older than 14 days."""
-    today = date.today()
-    for filename in os.listdir("data/prices"):
-        if filename.endswith(".json"):
-            file_date = dt.strptime(filename[:-5], "%d-%m-%Y").date()
-            if (today - file_date).days > 14:
-                os.remove(os.path.join("data/prices", filename))
-                current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
-                print(f"[{current_time}] Deleted old file: {filename}")
+async def cleanup_old_prices():
+    """Keep hourly samples for 14 days and daily aggregates for a year."""
+    samples_cutoff = dt.now() - timedelta(days=14)
+    daily_cutoff = date.today() - timedelta(days=365)
+    await client.history.prune(samples_cutoff.timestamp(), daily_cutoff)
 
 async def periodic_refresh():
     """Periodically refresh and save price data every 60 minutes."""
     while True:
         try:
-            await save_daily_prices()  # Save the daily prices
-            await cleanup_old_files()  # Clean up old price files
+            await save_price_history()  # Save the current prices
+            await cleanup_old_prices()  # Downsample old price history
+            client.loop.create_task(client.images.prefetch(client.store.get("items")))  # Download missing item icons
         except Exception as e:
             current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
             print(f"[{current_time}] Error during periodic refresh: {e}")
@@ -183,24 +279,29 @@ async def load_cogs():
 
 # Initialize the database
 async def init_db():
-    async with aiosqlite.connect("data/reputation.db") as db:
-        await db.execute("""CREATE TABLE IF NOT EXISTS reputation (
-                            id INTEGER PRIMARY KEY,
-                            giver_id TEXT NOT NULL,
-                            receiver_uuid TEXT NOT NULL,
-                            reputation INTEGER NOT NULL,
-                            UNIQUE(giver_id, receiver_uuid))""")
-        await db.execute("""CREATE TABLE IF NOT EXISTS users (
-                            id INTEGER PRIMARY KEY,
-                            uuid TEXT NOT NULL,
-                            username TEXT NOT NULL)""")
-        await db.commit()
+    """Open the shared reputation database and migrate it to the latest schema."""
+    await client.db.connect()
+    await migrate_reputation_db(client.db)
 
 @client.event
 async def on_ready():
     """Triggered when the bot has successfully connected to Discord."""
     current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+    await client.http_client.start()  # Open the shared HTTP connection pool
     await init_db()
+    await client.alerts_db.connect()
+    await client.alerts.init()
+    await client.history_db.connect()
+    await client.history.init()
+    imported = await client.history.import_daily_files("data/prices")  # Migrate legacy daily JSON files
+    if imported:
+        print(f"[{current_time}] Imported {imported} daily price files into {client.history_db.path}")
+    translation_index.refresh()  # Build the translation index once at startup
+
+    # Derive the price index from prices.json if it was never persisted
+    if not client.store.get("price_index"):
+        client.store.publish(price_index=build_price_index(client.store.get("prices")))
+    client.store.publish(**await build_market_stats())
     await load_cogs()  # Load the Cogs
     print(f"[{current_time}] Logged in as {str(client.user)[:-5]} (ID: {client.user.id})")
     
@@ -214,5 +315,6 @@ async def on_ready():
     # Start the periodic data refresh task
     client.loop.create_task(periodic_refresh())
 
-# Run the bot with the token from 'api.json'
-client.run(api['TOKEN'])
+# Run the bot with the token from 'api.json'; the guard keeps spawned graph worker processes from starting it
+if __name__ == "__main__":
+    client.run(api['TOKEN'])
@@ -0,0 +1,100 @@
+import asyncio
+import types
+from commands.give_rep import giveRep
+from utils.database import Database
+from utils.reputation import migrate, totals, ranking
+
+class FakeResolver:
+    """Resolves every username to a fixed UUID, like UUIDResolver for names that exist."""
+
+    async def resolve(self, username: str) -> str:
+        await asyncio.sleep(0)  # Let the other votes run up to this point, as a real lookup would
+        return f"uuid-{username.lower()}"
+
+class FakeResponse:
+    """Collects the messages a command sends."""
+
+    def __init__(self, messages: list):
+        self.messages = messages
+
+    async def send_message(self, content: str, **kwargs):
+        self.messages.append(content)
+
+def interaction(user_id: int, messages: list, guild_id: int = 1):
+    """Build the parts of a discord.Interaction /give_rep uses."""
+    return types.SimpleNamespace(user=types.SimpleNamespace(id=user_id), guild_id=guild_id, response=FakeResponse(messages))
+
+def outcome(message: str) -> str:
+    """Classify a /give_rep reply as "already", "changed" or "new"."""
+    if "bereits" in message:
+        return "already"
+    if "geändert" in message:
+        return "changed"
+    return "new"
+
+async def run_votes(path: str, votes: list[tuple[int, str, str]]) -> tuple[list[str], Database]:
+    """Fire all (giver_id, username, reputation) votes at once and return the outcomes in request order."""
+    database = Database(path)
+    await database.connect()
+    await migrate(database)
+    cog = giveRep(types.SimpleNamespace(db=database, uuid_resolver=FakeResolver()))
+
+    replies = [[] for _ in votes]
+    await asyncio.gather(*(cog.giveRep.callback(cog, interaction(giver_id, reply), username, reputation)
+                           for (giver_id, username, reputation), reply in zip(votes, replies)))
+    return [outcome(reply[0]) for reply in replies], database
+
+def test_identical_votes_count_once(tmp_path):
+    async def scenario():
+        outcomes, database = await run_votes(str(tmp_path / "reputation.db"), [(1, "Notch", "Positive")] * 50)
+        try:
+            assert outcomes.count("new") == 1
+            assert outcomes.count("already") == 49
+            assert await totals(database, "receiver", ["uuid-notch"]) == {"uuid-notch": (1, 0, 1)}
+        finally:
+            await database.close()
+
+    asyncio.run(scenario())
+
+def test_alternating_votes_end_consistent(tmp_path):
+    async def scenario():
+        votes = [(1, "Notch", "Positive" if i % 3 else "Negative") for i in range(60)]
+        outcomes, database = await run_votes(str(tmp_path / "reputation.db"), votes)
+        try:
+            # Votes are applied one transaction at a time in request order
+            expected, previous = [], None
+            for _, _, reputation in votes:
+                expected.append("new" if previous is None else "already" if reputation == previous else "changed")
+                previous = reputation
+            assert outcomes == expected
+
+            stored = await database.fetchone("SELECT reputation, revision FROM reputation WHERE giver_id = 1")
+            assert stored == (1 if previous == "Positive" else -1, outcomes.count("changed"))
+            # Negative votes are summed as negative numbers
+            assert await totals(database, "receiver", ["uuid-notch"]) == {"uuid-notch": (max(stored[0], 0), min(stored[0], 0), stored[0])}
+        finally:
+            await database.close()
+
+    asyncio.run(scenario())
+
+def test_many_givers_keep_totals_and_ranking_in_sync(tmp_path):
+    async def scenario():
+        votes = [(giver_id, f"player{giver_id % 7}", "Positive" if giver_id % 4 else "Negative") for giver_id in range(200)]
+        outcomes, database = await run_votes(str(tmp_path / "reputation.db"), votes)
+        try:
+            assert outcomes == ["new"] * len(votes)
+
+            expected = {}
+            for giver_id, username, reputation in votes:
+                positive, negative, overall = expected.get(f"uuid-{username.lower()}", (0, 0, 0))
+                value = 1 if reputation == "Positive" else -1
+                expected[f"uuid-{username.lower()}"] = (positive + max(value, 0), negative + min(value, 0), overall + value)
+            assert await totals(database, "receiver", list(expected)) == expected
+
+            for guild_id in (None, 1):
+                rows = await ranking(database, guild_id, 1)
+                assert {uuid: (positive, negative, overall) for uuid, _, positive, negative, overall in rows} == expected
+        finally:
+            await database.close()
+
+    asyncio.run(scenario())
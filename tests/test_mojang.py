@@ -0,0 +1,111 @@
+import asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from utils.database import Database
+from utils.http import HttpClient
+from utils.mojang import UUIDResolver
+from utils.reputation import migrate
+
+PROFILES = {f"player{i}": f"uuid{i:028d}" for i in range(15)}
+
+class StubMojang:
+    """A local stand-in for the profile and bulk endpoints that records every request."""
+
+    def __init__(self, bulk_status: int = 200, bulk_body: str | None = None, profile_status: int | None = None):
+        self.bulk_status = bulk_status
+        self.bulk_body = bulk_body
+        self.profile_status = profile_status
+        self.bulk_requests = []
+        self.profile_requests = []
+
+    async def bulk(self, request: web.Request) -> web.Response:
+        names = await request.json()
+        self.bulk_requests.append(names)
+        if self.bulk_status != 200:
+            return web.Response(status=self.bulk_status)
+        if self.bulk_body is not None:
+            return web.Response(text=self.bulk_body, content_type="application/json")
+        return web.json_response([{"id": PROFILES[name.lower()], "name": name.lower()}
+                                  for name in names if name.lower() in PROFILES])
+
+    async def profile(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        self.profile_requests.append(name)
+        if self.profile_status is not None:
+            return web.Response(status=self.profile_status)
+        if name.lower() not in PROFILES:
+            return web.Response(status=404)
+        return web.json_response({"id": PROFILES[name.lower()], "name": name.lower()})
+
+async def run_resolver(tmp_path, stub: StubMojang, scenario):
+    """Serve the stub on a free local port and run scenario(resolver, database) against it."""
+    app = web.Application()
+    app.router.add_post("/bulk", stub.bulk)
+    app.router.add_get("/profiles/{name}", stub.profile)
+    server = TestServer(app)
+    await server.start_server()
+
+    database = Database(str(tmp_path / "reputation.db"))
+    await database.connect()
+    await migrate(database)
+    http = HttpClient(timeout=5, retries=0)
+    resolver = UUIDResolver(http, database, profile_url=str(server.make_url("/profiles")), bulk_url=str(server.make_url("/bulk")))
+    try:
+        await scenario(resolver, database)
+    finally:
+        await http.close()
+        await database.close()
+        await server.close()
+
+def test_lookups_are_batched_and_misses_cached(tmp_path):
+    stub = StubMojang()
+
+    async def scenario(resolver, database):
+        names = [f"Player{i}" for i in range(12)] + ["ghost1", "ghost2"]
+        uuids = await resolver.resolve_many(names)
+        assert uuids == {name: PROFILES.get(name.lower()) for name in names}
+        # 14 names in one batch window: one full bulk request and one with the rest, no single lookups
+        assert sorted(len(request) for request in stub.bulk_requests) == [4, 10]
+        assert stub.profile_requests == []
+        assert await database.fetchone("SELECT count(*) FROM users") == (12,)
+
+        # Known names come from memory and unknown names from the miss cache
+        assert await resolver.resolve_many(names) == uuids
+        assert len(stub.bulk_requests) == 2
+
+    asyncio.run(run_resolver(tmp_path, stub, scenario))
+
+def test_failed_bulk_request_falls_back_to_single_lookups(tmp_path):
+    stub = StubMojang(bulk_status=500)
+
+    async def scenario(resolver, database):
+        uuids = await resolver.resolve_many(["Player1", "Player2", "ghost"])
+        assert uuids == {"Player1": PROFILES["player1"], "Player2": PROFILES["player2"], "ghost": None}
+        assert sorted(stub.profile_requests) == ["Player1", "Player2", "ghost"]
+
+        # The 404 was cached as a miss
+        assert await resolver.resolve("ghost") is None
+        assert len(stub.profile_requests) == 3
+
+    asyncio.run(run_resolver(tmp_path, stub, scenario))
+
+def test_unusable_answers_keep_the_stored_name_and_cache_nothing(tmp_path):
+    async def check(stub: StubMojang):
+        async def scenario(resolver, database):
+            # A mapping older than the ttl is used as long as Mojang gives no usable answer
+            await resolver.store("stale-uuid", "Player1", 0)
+            assert await resolver.resolve_many(["Player1", "ghost"]) == {"Player1": "stale-uuid", "ghost": None}
+            requests = len(stub.bulk_requests) + len(stub.profile_requests)
+
+            # Nothing was cached, so the next lookup asks again
+            assert await resolver.resolve("ghost") is None
+            assert len(stub.bulk_requests) + len(stub.profile_requests) > requests
+
+        await run_resolver(tmp_path, stub, scenario)
+
+    async def checks():
+        await check(StubMojang(bulk_body="not json"))
+        await check(StubMojang(bulk_body='[{"id": "no-name"}]'))
+        await check(StubMojang(bulk_status=500, profile_status=429))
+
+    asyncio.run(checks())
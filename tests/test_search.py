@@ -0,0 +1,100 @@
+import json
+import os
+from utils.persist import load_json
+from utils.search import SearchIndex, levenshtein_distance
+
+ITEMS_FILE = "data/items.json"
+GOLDEN_FILE = os.path.join(os.path.dirname(__file__), "search_golden.json")
+
+def legacy_find_best_match(query: str, items_dict: dict) -> tuple[str, str]:
+    """The /price item matching before the search index, kept verbatim as the reference ranking."""
+    query = query.lower()
+
+    substring_matches = [(eng_name, ger_name) for eng_name, ger_name in items_dict.items()
+                         if query in eng_name.lower() or query in ger_name.lower()]
+
+    if substring_matches:
+        closest_match_eng = None
+        closest_match_ger = None
+        lowest_distance = float('inf')
+
+        for eng_name, ger_name in substring_matches:
+            distance_eng = levenshtein_distance(query, eng_name.lower())
+            distance_ger = levenshtein_distance(query, ger_name.lower())
+
+            if distance_eng < lowest_distance:
+                closest_match_eng = eng_name
+                closest_match_ger = ger_name
+                lowest_distance = distance_eng
+            if distance_ger < lowest_distance:
+                closest_match_eng = eng_name
+                closest_match_ger = ger_name
+                lowest_distance = distance_ger
+
+        return closest_match_eng, closest_match_ger
+
+    closest_match_eng = None
+    closest_match_ger = None
+    lowest_distance = float('inf')
+
+    for eng_name, ger_name in items_dict.items():
+        distance_eng = levenshtein_distance(query, eng_name.lower())
+        distance_ger = levenshtein_distance(query, ger_name.lower())
+
+        if distance_eng < distance_ger:
+            if distance_eng < lowest_distance:
+                closest_match_eng = eng_name
+                closest_match_ger = ger_name
+                lowest_distance = distance_eng
+        else:
+            if distance_ger < lowest_distance:
+                closest_match_eng = eng_name
+                closest_match_ger = ger_name
+                lowest_distance = distance_ger
+
+    return closest_match_eng, closest_match_ger
+
+def golden_queries(items: dict) -> list[str]:
+    """Derive full names, prefixes, inner substrings, single words and typos of every item, plus free-form queries."""
+    queries = ["diamant", "dia", "netherite", "log", "stamm", "spawn ei", "glas", "block", "eisen", "gold",
+               "redstone", "sword", "schwert", "emerald", "smaragd", "holz", "xyz", "qqqqqqqq", "a", "ei"]
+    for eng_name, ger_name in items.items():
+        for name in (eng_name.lower(), ger_name.lower()):
+            queries += [name, name.replace("_", " "), name[:3], name[:5], name[1:-1], name.split("_")[-1].split(" ")[-1]]
+            if len(name) > 3:
+                middle = len(name) // 2
+                queries += [name[:middle] + name[middle + 1:],                             # Deletion
+                            name[:middle] + name[middle + 1] + name[middle] + name[middle + 2:],  # Transposition
+                            name[:middle] + "x" + name[middle + 1:]]                      # Substitution
+    return list(dict.fromkeys(query for query in queries if query))
+
+def build_index(items: dict) -> SearchIndex:
+    """Build the index the way MarketCog does."""
+    return SearchIndex({eng_name: (ger_name, eng_name) for eng_name, ger_name in items.items()})
+
+def test_search_matches_golden_rankings():
+    items = load_json(ITEMS_FILE)
+    with open(GOLDEN_FILE, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+
+    index = build_index(items)
+    results = {query: (index.search(query, 1) or [None])[0] for query in golden}
+    assert {query: (result, golden[query]) for query, result in results.items() if result != golden[query]} == {}
+
+def test_golden_rankings_match_legacy_matching():
+    # The full golden set takes half a minute with the legacy matching; a fixed sample keeps the golden file honest
+    items = load_json(ITEMS_FILE)
+    with open(GOLDEN_FILE, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+
+    assert set(golden) == set(golden_queries(items))
+    for query in list(golden)[::40]:
+        assert golden[query] == legacy_find_best_match(query, items)[0]
+
+if __name__ == "__main__":
+    # Regenerate the golden file from the legacy matching after data/items.json changed: python -m tests.test_search
+    items = load_json(ITEMS_FILE)
+    golden = {query: legacy_find_best_match(query, items)[0] for query in golden_queries(items)}
+    with open(GOLDEN_FILE, "w", encoding="utf-8") as f:
+        json.dump(golden, f, ensure_ascii=False, indent=1)
+    print(f"Wrote {len(golden)} queries to {GOLDEN_FILE}")
@@ -0,0 +1,108 @@
+import time
+
+# Sides as stored in the alerts table, matching the history database
+SIDES = {"buy": 0, "sell": 1}
+
+# Directions as stored in the alerts table
+ABOVE = 1
+BELOW = -1
+
+class AlertStore:
+    """
+    Price alert subscriptions in SQLite.
+
+    An alert fires once when the BUY or SELL price of a material reaches its threshold from below (ABOVE) or above
+    (BELOW), and is deleted when it fires. Alerts are indexed by (material, side, direction, threshold), so evaluating
+    all of them against a new price snapshot is one range scan per material and side, however many alerts exist.
+    """
+
+    def __init__(self, db, max_per_user: int = 25):
+        """
+        Initialize the alert store.
+
+        Args:
+            db (Database): The alerts database.
+            max_per_user (int): Number of active alerts a user may have.
+        """
+        self.db = db
+        self.max_per_user = max_per_user
+
+    async def init(self):
+        """Create the alerts table and its indexes if they do not exist yet."""
+        async with self.db.transaction() as db:
+            await db.execute("""CREATE TABLE IF NOT EXISTS alerts (
+                                id INTEGER PRIMARY KEY,
+                                user_id INTEGER NOT NULL,
+                                material TEXT NOT NULL,
+                                side INTEGER NOT NULL,
+                                direction INTEGER NOT NULL,
+                                threshold REAL NOT NULL,
+                                created_at INTEGER NOT NULL)""")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_alerts_trigger ON alerts (material, side, direction, threshold)")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_alerts_user ON alerts (user_id)")
+
+    async def add(self, user_id: int, material: str, side: int, direction: int, threshold: float) -> int | None:
+        """
+        Subscribe a user to an alert.
+
+        Returns:
+            int | None: The alert ID, or None if the user already has `max_per_user` alerts.
+        """
+        async with self.db.transaction() as db:
+            cursor = await db.execute("SELECT count(*) FROM alerts WHERE user_id = ?", (user_id,))
+            if (await cursor.fetchone())[0] >= self.max_per_user:
+                return None
+            cursor = await db.execute("""INSERT INTO alerts (user_id, material, side, direction, threshold, created_at)
+                                         VALUES (?, ?, ?, ?, ?, ?) RETURNING id""",
+                                      (user_id, material, side, direction, threshold, int(time.time())))
+            return (await cursor.fetchone())[0]
+
+    async def user_alerts(self, user_id: int) -> list[tuple]:
+        """Return a user's alerts as (id, material, side, direction, threshold) rows, oldest first."""
+        return await self.db.fetchall("""SELECT id, material, side, direction, threshold FROM alerts
+                                         WHERE user_id = ? ORDER BY id""", (user_id,))
+
+    async def remove(self, user_id: int, alert_id: int) -> bool:
+        """Delete one of a user's alerts and return whether it existed."""
+        async with self.db.transaction() as db:
+            cursor = await db.execute("DELETE FROM alerts WHERE id = ? AND user_id = ?", (alert_id, user_id))
+            return cursor.rowcount > 0
+
+    async def evaluate(self, price_index: dict) -> list[tuple]:
+        """
+        Fire every alert whose threshold the current prices reached, and delete it.
+
+        The current prices are loaded into a temporary table and joined against the trigger index in a single
+        statement. The CROSS JOIN pins the prices as the outer loop, since the planner would otherwise scan all alerts
+        and probe the prices, so the cost grows with the number of materials and fired alerts, not with all alerts. A price of 0
+        means the side has no orders and is left out, so it cannot fire BELOW alerts.
+
+        Args:
+            price_index (dict): Material -> PriceRecord of the current snapshot.
+
+        Returns:
+            list[tuple]: (id, user_id, material, side, direction, threshold) of every fired alert.
+        """
+        prices = [(material, side, price)
+                  for material, record in price_index.items()
+                  for side, price in ((SIDES["buy"], record.buy), (SIDES["sell"], record.sell))
+                  if price is not None and price > 0]
+
+        async with self.db.transaction() as db:
+            await db.execute("""CREATE TEMP TABLE IF NOT EXISTS current_prices (
+                                material TEXT NOT NULL,
+                                side INTEGER NOT NULL,
+                                price REAL NOT NULL,
+                                PRIMARY KEY (material, side)) WITHOUT ROWID""")
+            await db.execute("DELETE FROM current_prices")
+            await db.executemany("INSERT INTO current_prices (material, side, price) VALUES (?, ?, ?)", prices)
+            cursor = await db.execute(f"""DELETE FROM alerts WHERE id IN (
+                                              SELECT a.id FROM current_prices p CROSS JOIN alerts a
+                                              ON a.material = p.material AND a.side = p.side
+                                                 AND a.direction = {ABOVE} AND a.threshold <= p.price
+                                              UNION ALL
+                                              SELECT a.id FROM current_prices p CROSS JOIN alerts a
+                                              ON a.material = p.material AND a.side = p.side
+                                                 AND a.direction = {BELOW} AND a.threshold >= p.price)
+                                          RETURNING id, user_id, material, side, direction, threshold""")
+            return await cursor.fetchall()
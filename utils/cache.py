@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+class LRUCache:
+    """Least-recently-used cache bounded by the total size of its values."""
+
+    def __init__(self, maxsize: int, sizeof=None):
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize (int): Upper bound for the summed size of all cached values.
+            sizeof (callable): Returns the size of a value; every value counts as 1 if omitted.
+        """
+        self.maxsize = maxsize
+        self.sizeof = sizeof or (lambda value: 1)
+        self.entries = OrderedDict()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self.entries
+
+    def get(self, key, default=None):
+        """Return the cached value for a key and mark it as recently used."""
+        if key not in self.entries:
+            return default
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        """Insert or replace a value, evicting the least recently used entries beyond the size bound."""
+        if key in self.entries:
+            self.size -= self.sizeof(self.entries.pop(key))
+        size = self.sizeof(value)
+        if size > self.maxsize:
+            return
+        self.entries[key] = value
+        self.size += size
+        while self.size > self.maxsize:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= self.sizeof(evicted)
+
+    def pop(self, key, default=None):
+        """Remove a key and return its value."""
+        if key not in self.entries:
+            return default
+        value = self.entries.pop(key)
+        self.size -= self.sizeof(value)
+        return value
+
+    def clear(self):
+        """Remove all entries."""
+        self.entries.clear()
+        self.size = 0
@@ -0,0 +1,97 @@
+import asyncio
+import aiosqlite
+from contextlib import asynccontextmanager
+
+class Database:
+    """
+    Long-lived SQLite connections shared by the whole bot.
+
+    The database runs in WAL mode with one reader and one writer connection. Reads go to the reader and never wait for
+    writes; writes go through `transaction()`, which lets one transaction at a time onto the writer connection in the
+    order they were requested. Both connections keep a cache of prepared statements, so queries issued with the same
+    SQL text are compiled only once.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",  # Durable across application crashes, fsyncs only on checkpoints in WAL mode
+        "PRAGMA busy_timeout = 5000",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -16000",  # 16 MB page cache per connection
+        "PRAGMA mmap_size = 67108864",
+        "PRAGMA foreign_keys = ON",
+    )
+
+    def __init__(self, path: str, cached_statements: int = 256):
+        """
+        Initialize the connection manager.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            cached_statements (int): Number of prepared statements kept per connection.
+        """
+        self.path = path
+        self.cached_statements = cached_statements
+        self.reader = None
+        self.writer = None
+        self.write_lock = asyncio.Lock()
+
+    async def connect(self):
+        """Open the reader and writer connections. Calling it again while they are open does nothing."""
+        if self.writer is not None:
+            return
+        # The writer manages its transactions itself, so it runs without the implicit BEGIN of the sqlite3 module
+        self.writer = await aiosqlite.connect(self.path, isolation_level=None, cached_statements=self.cached_statements)
+        for pragma in self.PRAGMAS:
+            await self.writer.execute(pragma)
+        self.reader = await aiosqlite.connect(self.path, isolation_level=None, cached_statements=self.cached_statements)
+        for pragma in self.PRAGMAS[1:]:
+            await self.reader.execute(pragma)
+
+    async def close(self):
+        """Close both connections."""
+        for connection in (self.reader, self.writer):
+            if connection is not None:
+                await connection.close()
+        self.reader = self.writer = None
+
+    async def fetchone(self, sql: str, parameters: tuple = ()) -> tuple | None:
+        """Run a read query and return its first row."""
+        cursor = await self.reader.execute(sql, parameters)
+        try:
+            return await cursor.fetchone()
+        finally:
+            await cursor.close()
+
+    async def fetchall(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        """Run a read query and return all rows."""
+        cursor = await self.reader.execute(sql, parameters)
+        try:
+            return await cursor.fetchall()
+        finally:
+            await cursor.close()
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Run a write transaction on the writer connection.
+
+        The transaction takes the write lock up front (BEGIN IMMEDIATE), so reads inside it see a state no other write
+        can change before it commits. It is rolled back if the block raises.
+
+        Yields:
+            aiosqlite.Connection: The writer connection.
+        """
+        async with self.write_lock:
+            await self.writer.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.writer
+            except BaseException:
+                await self.writer.rollback()
+                raise
+            await self.writer.commit()
+
+    async def execute(self, sql: str, parameters: tuple = ()):
+        """Run a single write statement in its own transaction."""
+        async with self.transaction() as db:
+            await db.execute(sql, parameters)
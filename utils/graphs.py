@@ -0,0 +1,186 @@
+import io
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.dates as mdates
+import matplotlib.ticker as ticker
+from matplotlib.figure import Figure
+
+# Pre-styled figure and axes reused by every render of a worker process
+template_figure = None
+template_axes = None
+
+def format_price_tick(value, tick_number):
+    """Format y-axis labels with K and M suffixes."""
+    if value >= 1_000_000:
+        return f'{value/1_000_000:.0f}M'
+    elif value >= 1_000:
+        return f'{value/1_000:.0f}K'
+    else:
+        return f'{value:.0f}'
+
+def init_worker():
+    """Build the styled figure template once per worker process."""
+    global template_figure, template_axes
+    template_figure = Figure(figsize=(12, 6))
+    template_axes = template_figure.add_subplot()
+
+    ax = template_axes
+    ax.set_xlabel('Datum')
+    ax.set_ylabel('Preis')
+    ax.yaxis.set_major_formatter(ticker.FuncFormatter(format_price_tick))
+
+    # Set the background color to be transparent
+    template_figure.patch.set_facecolor('none')
+    ax.set_facecolor('none')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('white')
+    ax.spines['bottom'].set_color('white')
+    ax.yaxis.label.set_color('white')
+    ax.xaxis.label.set_color('white')
+    ax.tick_params(axis='both', colors='white')
+    ax.grid(True, linestyle='--', alpha=0.5, color='white')
+
+def render_price_history(title: str, history: dict, days: int) -> bytes:
+    """
+    Render a graph showing the price history of an item over the last days.
+
+    Runs inside a worker process and reuses its figure template.
+
+    Args:
+        title (str): The formatted item name shown in the graph title.
+        history (dict): "BUY" and "SELL" daily aggregates as returned by PriceHistory.read_daily.
+        days (int): The number of days to show, including today.
+
+    Returns:
+        bytes: The graph as a PNG image.
+    """
+    if template_axes is None:
+        init_worker()
+    ax = template_axes
+
+    # Remove the data of the previous render
+    for artist in list(ax.lines) + list(ax.collections):
+        artist.remove()
+    if ax.get_legend():
+        ax.get_legend().remove()
+
+    # Get the date for the current day and the first day of the range
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days - 1)
+
+    # Index the daily aggregates by day
+    buy_days = {row[0].strftime("%d-%m-%Y"): row for row in history["BUY"]}
+    sell_days = {row[0].strftime("%d-%m-%Y"): row for row in history["SELL"]}
+
+    # Create a list of all dates in the range
+    dates = [start_date + timedelta(days=i) for i in range(days)]
+    dates_str = [date.strftime("%d-%m-%Y") for date in dates]
+
+    # Prepare buy and sell closing prices; days without price data or with a close of 0 (no orders) are NaN, so the
+    # line breaks instead of dropping to 0
+    def close(days_data: dict, date_str: str) -> float:
+        row = days_data.get(date_str)
+        return row[4] if row and row[4] > 0 else float('nan')
+
+    buy_values = [close(buy_days, date_str) for date_str in dates_str]
+    sell_values = [close(sell_days, date_str) for date_str in dates_str]
+
+    # Plotting the graph
+    marker = 'o' if days <= 31 else None
+    ax.plot(dates, buy_values, label='Kaufpreis', color='blue', marker=marker, linestyle='-')
+    ax.plot(dates, sell_values, label='Verkaufspreis', color='red', marker=marker, linestyle='-')
+
+    # Shade the intraday low-high range of the days that have a close; a low of 0 recorded before zero prices were
+    # left out of the daily aggregates is replaced by the lower of open and close
+    for days_data, color in ((buy_days, 'blue'), (sell_days, 'red')):
+        shaded = [(date, days_data[date_str]) for date, date_str in zip(dates, dates_str)
+                  if date_str in days_data and days_data[date_str][4] > 0]
+        if shaded:
+            lows = [row[3] if row[3] > 0 else min(price for price in (row[1], row[4]) if price > 0) for date, row in shaded]
+            ax.fill_between([date for date, row in shaded], lows,
+                            [row[2] for date, row in shaded], color=color, alpha=0.15, linewidth=0)
+
+    ax.set_title(f'Preisverlauf für {title}', color='white')
+    ax.legend()
+    ax.relim()
+    ax.autoscale_view()
+
+    # Format x-axis to show all dates in the range, or let matplotlib thin them out for long ranges
+    if days <= 31:
+        ax.xaxis.set_major_locator(mdates.DayLocator())
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d-%m-%Y'))
+        ax.set_xticks(dates)  # Ensure ticks match all dates
+    else:
+        ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d-%m-%Y'))
+    template_figure.autofmt_xdate()  # Automatically format dates on x-axis
+
+    # Save the plot to PNG bytes
+    image_stream = io.BytesIO()
+    template_figure.savefig(image_stream, format='png', bbox_inches='tight', transparent=True)
+    return image_stream.getvalue()
+
+class GraphRenderer:
+    """Renders price history graphs in a bounded process pool, off the event loop."""
+
+    def __init__(self, workers: int = 2, max_queue: int = 8, timeout: float = 10.0):
+        """
+        Start the worker pool.
+
+        Args:
+            workers (int): Number of worker processes.
+            max_queue (int): Renders allowed in flight before new requests are turned away.
+            timeout (float): Seconds to wait for a render before giving up on it.
+        """
+        # Spawned rather than forked: the pool starts lazily, when the database and I/O threads already run, and a fork
+        # would copy their locks in whatever state they are
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    def render_done(self, future):
+        """Track the queue depth once a submitted render finished, even if nobody waits for it anymore."""
+        self.queue_depth -= 1
+
+    async def render(self, title: str, history: dict, days: int) -> bytes | None:
+        """
+        Render a price history graph in the pool.
+
+        Args:
+            title (str): The formatted item name shown in the graph title.
+            history (dict): "BUY" and "SELL" daily aggregates as returned by PriceHistory.read_daily.
+            days (int): The number of days to show, including today.
+
+        Returns:
+            bytes | None: The PNG image, or None if the pool is saturated or the render timed out.
+        """
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if self.queue_depth >= self.max_queue:
+            print(f"[{current_time}] Graph renderer saturated (queue depth {self.queue_depth}), skipping graph")
+            return None
+
+        future = asyncio.get_running_loop().run_in_executor(self.executor, render_price_history, title, history, days)
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        future.add_done_callback(self.render_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            print(f"[{current_time}] Graph render timed out after {self.timeout}s (queue depth {self.queue_depth})")
+            return None
+        except Exception as e:
+            print(f"[{current_time}] Graph render failed: {e}")
+            return None
+
+    def close(self):
+        """Shut the worker pool down without waiting for pending renders."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,200 @@
+import json
+import os
+import aiosqlite
+from datetime import datetime as dt, date
+
+SIDES = {"BUY": 0, "SELL": 1}
+
+class PriceHistory:
+    """
+    SQLite-backed price history.
+
+    Every market sample is kept in `price_history`, keyed by (material, side, timestamp). Each sample is also folded
+    into a per-day open/high/low/close row in `price_daily`, so hourly samples only need to be kept for a short window
+    while the daily aggregates cover long ranges. The samples only feed the daily aggregates: they make recording the
+    same sample twice a no-op and let the aggregates be rebuilt; every read goes to `price_daily`.
+
+    Reads go to the long-lived reader connection of the shared `Database`, so a graph or matrix build never opens a
+    connection of its own; recording and pruning run as transactions on its writer.
+    """
+
+    def __init__(self, db):
+        """
+        Initialize the history store.
+
+        Args:
+            db (Database): The history database.
+        """
+        self.db = db
+
+    async def init(self):
+        """Create the history tables if they do not exist yet."""
+        async with self.db.transaction() as db:
+            await db.execute("""CREATE TABLE IF NOT EXISTS materials (
+                                id INTEGER PRIMARY KEY,
+                                name TEXT NOT NULL UNIQUE)""")
+            await db.execute("""CREATE TABLE IF NOT EXISTS price_history (
+                                material_id INTEGER NOT NULL,
+                                side INTEGER NOT NULL,
+                                ts INTEGER NOT NULL,
+                                price REAL NOT NULL,
+                                active_orders INTEGER,
+                                PRIMARY KEY (material_id, side, ts)) WITHOUT ROWID""")
+            await db.execute("""CREATE TABLE IF NOT EXISTS price_daily (
+                                material_id INTEGER NOT NULL,
+                                side INTEGER NOT NULL,
+                                day INTEGER NOT NULL,
+                                open REAL NOT NULL,
+                                high REAL NOT NULL,
+                                low REAL NOT NULL,
+                                close REAL NOT NULL,
+                                active_orders INTEGER,
+                                samples INTEGER NOT NULL,
+                                PRIMARY KEY (material_id, side, day)) WITHOUT ROWID""")
+            await db.execute("""CREATE TABLE IF NOT EXISTS imported_files (
+                                name TEXT PRIMARY KEY)""")
+
+            # Backfill the daily aggregates from samples recorded before they existed
+            cursor = await db.execute("SELECT EXISTS (SELECT 1 FROM price_daily)")
+            if not (await cursor.fetchone())[0]:
+                cursor = await db.execute("""SELECT m.name, h.side, h.ts, h.price, h.active_orders
+                                             FROM price_history h JOIN materials m ON m.id = h.material_id
+                                             ORDER BY h.ts""")
+                await self.insert_daily(db, await cursor.fetchall())
+
+    def rows(self, prices_data: dict, ts: int) -> list[tuple]:
+        """Flatten a /market/prices payload into (material, side, ts, price, active_orders) rows."""
+        rows = []
+        for category, items in prices_data.items():
+            for material, orders in items.items():
+                for price_info in orders:
+                    side = SIDES.get(price_info['orderSide'])
+                    if side is not None:
+                        rows.append((material, side, ts, price_info['price'], price_info.get('activeOrders')))
+        return rows
+
+    async def insert_daily(self, db: aiosqlite.Connection, rows: list[tuple]):
+        """
+        Fold samples into their day's open/high/low/close row. Rows must be ordered by timestamp.
+
+        Samples with a price of 0 are left out: the market reports 0 when a side has no orders, so such a day gets no
+        row and shows as a gap instead of pulling the low and close down to 0.
+        """
+        await db.executemany("""INSERT INTO price_daily (material_id, side, day, open, high, low, close, active_orders, samples)
+                                VALUES ((SELECT id FROM materials WHERE name = ?), ?, ?, ?, ?, ?, ?, ?, 1)
+                                ON CONFLICT (material_id, side, day) DO UPDATE SET
+                                    high = max(high, excluded.high),
+                                    low = min(low, excluded.low),
+                                    close = excluded.close,
+                                    active_orders = excluded.active_orders,
+                                    samples = samples + 1""",
+                             [(material, side, date.fromtimestamp(ts).toordinal(), price, price, price, price, orders)
+                              for material, side, ts, price, orders in rows if price > 0])
+
+    async def insert(self, db: aiosqlite.Connection, rows: list[tuple]):
+        """
+        Insert samples and update the daily aggregates, registering any unseen materials first.
+
+        Only samples that were actually inserted are folded, so recording a (material, side, ts) sample again does not
+        count it twice.
+        """
+        await db.executemany("INSERT OR IGNORE INTO materials (name) VALUES (?)", {(row[0],) for row in rows})
+        inserted = []
+        for row in rows:
+            cursor = await db.execute("""INSERT OR IGNORE INTO price_history (material_id, side, ts, price, active_orders)
+                                         VALUES ((SELECT id FROM materials WHERE name = ?), ?, ?, ?, ?)""", row)
+            if cursor.rowcount:
+                inserted.append(row)
+        await self.insert_daily(db, inserted)
+
+    async def record(self, prices_data: dict, ts: float):
+        """
+        Store one market sample.
+
+        Args:
+            prices_data (dict): The prices payload as returned by the market API.
+            ts (float): Unix timestamp of the sample.
+        """
+        async with self.db.transaction() as db:
+            await self.insert(db, self.rows(prices_data, int(ts)))
+
+    async def read_daily(self, material: str, since: date) -> dict[str, list[tuple]]:
+        """
+        Read one material's daily aggregates with a single range scan over the primary key.
+
+        Args:
+            material (str): The English material name, e.g. "ACACIA_LOG".
+            since (date): The oldest day to return.
+
+        Returns:
+            dict[str, list[tuple]]: "BUY" and "SELL" lists of (date, open, high, low, close, active_orders), oldest first.
+        """
+        history = {"BUY": [], "SELL": []}
+        sides = {value: key for key, value in SIDES.items()}
+        rows = await self.db.fetchall("""SELECT side, day, open, high, low, close, active_orders FROM price_daily
+                                         WHERE material_id = (SELECT id FROM materials WHERE name = ?) AND day >= ?
+                                         ORDER BY side, day""", (material, since.toordinal()))
+        for side, day, *values in rows:
+            history[sides[side]].append((date.fromordinal(day), *values))
+        return history
+
+    async def read_daily_all(self, since: date) -> list[tuple]:
+        """
+        Read the daily closes and order counts of all materials in one scan, e.g. to build a price matrix.
+
+        Args:
+            since (date): The oldest day to return.
+
+        Returns:
+            list[tuple]: (material, side, day ordinal, close, active_orders) rows.
+        """
+        return await self.db.fetchall("""SELECT m.name, d.side, d.day, d.close, d.active_orders
+                                         FROM price_daily d JOIN materials m ON m.id = d.material_id
+                                         WHERE d.day >= ?""", (since.toordinal(),))
+
+    async def prune(self, samples_before: float, daily_before: date):
+        """
+        Downsample the history by dropping old data.
+
+        Args:
+            samples_before (float): Unix timestamp; individual samples older than this are deleted.
+            daily_before (date): Daily aggregates older than this day are deleted.
+        """
+        async with self.db.transaction() as db:
+            await db.execute("DELETE FROM price_history WHERE ts < ?", (int(samples_before),))
+            await db.execute("DELETE FROM price_daily WHERE day < ?", (daily_before.toordinal(),))
+
+    async def import_daily_files(self, prices_dir: str = "data/prices") -> int:
+        """
+        Migrate the legacy data/prices/DD-MM-YYYY.json files into the history store.
+
+        Each file is imported once, as a sample taken at noon of its day.
+
+        Returns:
+            int: The number of files imported.
+        """
+        if not os.path.isdir(prices_dir):
+            return 0
+
+        imported = 0
+        async with self.db.transaction() as db:
+            cursor = await db.execute("SELECT name FROM imported_files")
+            done = {row[0] for row in await cursor.fetchall()}
+
+            for filename in sorted(os.listdir(prices_dir)):
+                if not filename.endswith(".json") or filename in done:
+                    continue
+                try:
+                    file_date = dt.strptime(filename[:-5], "%d-%m-%Y")
+                    with open(os.path.join(prices_dir, filename), "r") as f:
+                        prices_data = json.load(f)
+                except (ValueError, OSError) as e:
+                    current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+                    print(f"[{current_time}] Skipping {filename} during history import: {e}")
+                    continue
+
+                ts = int(file_date.replace(hour=12).timestamp())
+                await self.insert(db, self.rows(prices_data, ts))
+                await db.execute("INSERT INTO imported_files (name) VALUES (?)", (filename,))
+                imported += 1
+        return imported
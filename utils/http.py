@@ -0,0 +1,121 @@
+import json
+import random
+import asyncio
+import aiohttp
+from multidict import CIMultiDict
+from typing import NamedTuple
+from datetime import datetime as dt
+
+class HttpResponse(NamedTuple):
+    """A fully read HTTP response."""
+    status: int
+    headers: CIMultiDict
+    body: bytes
+
+    def json(self):
+        """Parse the body as JSON."""
+        return json.loads(self.body)
+
+    def text(self, encoding: str = 'utf-8') -> str:
+        """Decode the body as text."""
+        return self.body.decode(encoding, errors='replace')
+
+class HttpClient:
+    """Bot-wide HTTP client: one pooled aiohttp session with keep-alive, DNS caching, timeouts and retries."""
+
+    # Statuses worth another attempt
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, timeout: float = 10, limit_per_host: int = 8, keepalive_timeout: float = 30,
+                 dns_cache_ttl: int = 300, retries: int = 3, backoff: float = 0.5):
+        """
+        Configure the client; the session itself is created by start().
+
+        Args:
+            timeout (float): Total seconds allowed per attempt.
+            limit_per_host (int): Maximum simultaneous connections per host.
+            keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+            dns_cache_ttl (int): Seconds resolved host names are cached.
+            retries (int): Additional attempts after a failed one.
+            backoff (float): Base delay in seconds of the jittered exponential backoff.
+        """
+        self.timeout = timeout
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.retries = retries
+        self.backoff = backoff
+        self.session = None
+
+    async def start(self):
+        """Create the pooled session. Does nothing if it is already open."""
+        if self.session is not None and not self.session.closed:
+            return
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=self.limit_per_host,
+                                         ttl_dns_cache=self.dns_cache_ttl, keepalive_timeout=self.keepalive_timeout)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    async def close(self):
+        """Close the session and all pooled connections."""
+        if self.session is not None:
+            await self.session.close()
+
+    def retry_delay(self, attempt: int, retry_after: str | None = None) -> float | None:
+        """
+        Return the delay before the next attempt: the server's Retry-After if given, else full-jitter backoff.
+
+        Returns:
+            float | None: Seconds to wait, or None if the server asks for a longer wait than `timeout`; waiting that
+            long inside a command would outlast the interaction, so the response is returned instead.
+        """
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                pass
+            else:
+                return delay if delay <= self.timeout else None
+        return min(random.uniform(0, self.backoff * 2 ** attempt), self.timeout)
+
+    async def request(self, method: str, url: str, **kwargs) -> HttpResponse:
+        """
+        Send a request, retrying connection errors, timeouts and 429/5xx responses.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL to request.
+            **kwargs: Passed on to aiohttp, e.g. headers or json.
+
+        Returns:
+            HttpResponse: The response of the last attempt.
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: If the last attempt failed without a response.
+        """
+        await self.start()
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    body = await response.read()
+                    result = HttpResponse(response.status, CIMultiDict(response.headers), body)
+                if result.status not in self.RETRY_STATUSES or last_attempt:
+                    return result
+                delay = self.retry_delay(attempt, result.headers.get('Retry-After'))
+                if delay is None:
+                    return result
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    raise
+                delay = self.retry_delay(attempt)
+                current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+                print(f"[{current_time}] {method} {url} failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> HttpResponse:
+        """Send a GET request."""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> HttpResponse:
+        """Send a POST request."""
+        return await self.request("POST", url, **kwargs)
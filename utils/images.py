@@ -0,0 +1,101 @@
+import os
+import time
+import asyncio
+import aiohttp
+from datetime import datetime as dt
+
+class ItemImageResolver:
+    """Resolves item icons to local files, downloading missing ones once from img.mc-api.io."""
+
+    def __init__(self, http, items_dir: str = "data/items", fallback: str = "data/imagenotfound.png", miss_ttl: float = 86400):
+        """
+        Initialize the resolver.
+
+        Args:
+            http (HttpClient): The bot-wide HTTP client.
+            items_dir (str): Directory holding the minecraft_<name>.png icons; downloads are stored here too.
+            fallback (str): Image used when no icon can be found.
+            miss_ttl (float): Seconds a failed lookup is remembered before the API is asked again.
+        """
+        self.items_dir = items_dir
+        self.fallback = fallback
+        self.miss_ttl = miss_ttl
+        self.misses = {}
+        self.pending = {}
+        self.http = http
+
+    def local_path(self, item_name: str) -> str:
+        """Return the path of an item's icon in the disk cache."""
+        formatted_name = item_name.lower().replace(' ', '_')
+        return os.path.join(self.items_dir, f"minecraft_{formatted_name}.png")
+
+    async def resolve(self, item_name: str) -> str:
+        """
+        Return a local image path for an item, downloading the icon if it is not cached yet.
+
+        Concurrent lookups of the same item share one download.
+
+        Args:
+            item_name (str): The English item name, e.g. "ACACIA_LOG".
+
+        Returns:
+            str: The path of the cached icon, or the fallback image.
+        """
+        local_image_path = self.local_path(item_name)
+        if os.path.exists(local_image_path):
+            return local_image_path
+
+        # Skip the API for items it recently did not know
+        if self.misses.get(local_image_path, 0) > time.time():
+            return self.fallback
+
+        task = self.pending.get(local_image_path)
+        if task is None:
+            task = asyncio.ensure_future(self.download(item_name, local_image_path))
+            task.add_done_callback(lambda _: self.pending.pop(local_image_path, None))
+            self.pending[local_image_path] = task
+        found = await asyncio.shield(task)
+        return local_image_path if found else self.fallback
+
+    async def download(self, item_name: str, local_image_path: str) -> bool:
+        """Download an icon into the disk cache, remembering misses. Returns True if the icon was stored."""
+        formatted_name = item_name.lower().replace(' ', '_')
+        url = f"https://img.mc-api.io/{formatted_name}.png"
+        try:
+            response = await self.http.get(url)
+            if response.status == 200 and 'image' in response.headers.get('Content-Type', ''):
+                await asyncio.to_thread(self.store, local_image_path, response.body)
+                return True
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"[{current_time}] Failed to fetch image for {item_name}: {e}")
+
+        self.misses[local_image_path] = time.time() + self.miss_ttl
+        return False
+
+    def store(self, local_image_path: str, image: bytes):
+        """Write an icon to the disk cache without ever leaving a partial file behind."""
+        temp_path = f"{local_image_path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(image)
+        os.replace(temp_path, local_image_path)
+
+    async def prefetch(self, item_names, concurrency: int = 4) -> int:
+        """
+        Download the icons of all given items that are not cached yet.
+
+        Args:
+            item_names (Iterable[str]): English item names.
+            concurrency (int): Maximum number of parallel downloads.
+
+        Returns:
+            int: The number of icons that were downloaded.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        missing = [name for name in item_names if not os.path.exists(self.local_path(name))]
+
+        async def fetch(name):
+            async with semaphore:
+                return await self.resolve(name) != self.fallback
+
+        return sum(await asyncio.gather(*(fetch(name) for name in missing)))
@@ -0,0 +1,162 @@
+import math
+import numpy as np
+from datetime import date, timedelta
+from typing import NamedTuple
+from utils.history import SIDES
+
+# Days held by the matrix built after every history update, including today
+MATRIX_DAYS = 91
+
+class SideStats(NamedTuple):
+    """Derived statistics of the buy or sell side of a material; None where the history is too short."""
+    average_7: float | None
+    average_14: float | None
+    volatility: float | None
+    orders_trend: float | None
+
+class MarketStats(NamedTuple):
+    """Derived statistics of a material, precomputed for the /price embed."""
+    buy: SideStats
+    sell: SideStats
+
+def window_mean(values: np.ndarray) -> np.ndarray:
+    """Average along the last axis over the days that have a value; NaN if none has."""
+    count = np.sum(~np.isnan(values), axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(count > 0, np.nansum(values, axis=-1) / count, np.nan)
+
+def to_optional(values: list) -> list:
+    """Replace NaN with None in a list of floats."""
+    return [None if math.isnan(value) else value for value in values]
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """Replace every NaN along the last axis with the closest earlier value; leading NaNs stay NaN."""
+    positions = np.where(np.isnan(values), 0, np.arange(values.shape[-1]))
+    np.maximum.accumulate(positions, axis=-1, out=positions)
+    # Leading NaNs point at the first day, which is NaN itself
+    return np.take_along_axis(values, positions, axis=-1)
+
+class PriceMatrix:
+    """
+    Daily closes and order counts of all materials as (side, material, day) NumPy arrays.
+
+    Days without a sample are NaN, and so are closes of 0: the market reports 0 when a side has no orders. The matrix is built once from the daily history and answers ranking queries and
+    derives the per-item statistics of all materials with a few vectorized operations.
+    """
+
+    def __init__(self, rows: list[tuple], last_day: date, days: int):
+        """
+        Build the matrix.
+
+        Args:
+            rows (list[tuple]): (material, side, day ordinal, close, active_orders) rows, e.g. from
+                `PriceHistory.read_daily_all`.
+            last_day (date): The newest day in the matrix.
+            days (int): Number of days covered, ending with `last_day`.
+        """
+        self.last_day = last_day
+        self.days = days
+        first = last_day.toordinal() - days + 1
+        self.materials = sorted({row[0] for row in rows})
+        self.positions = {material: position for position, material in enumerate(self.materials)}
+
+        self.close = np.full((len(SIDES), len(self.materials), days), np.nan)
+        self.orders = np.full((len(SIDES), len(self.materials), days), np.nan)
+        rows = [row for row in rows if first <= row[2] <= last_day.toordinal()]
+        if rows:
+            sides = np.array([row[1] for row in rows])
+            materials = np.array([self.positions[row[0]] for row in rows])
+            columns = np.array([row[2] - first for row in rows])
+            self.close[sides, materials, columns] = [row[3] if row[3] > 0 else np.nan for row in rows]
+            self.orders[sides, materials, columns] = [np.nan if row[4] is None else row[4] for row in rows]
+        self.filled = forward_fill(self.close)
+
+    def day(self, column: int) -> date:
+        """Return the date of a day column."""
+        return self.last_day - timedelta(days=self.days - 1 - column)
+
+    def changes(self, side: int, days: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compare every material's latest close with its close `days` days earlier.
+
+        Missing days carry the last known close forward, so a material only needs a sample on or before both days.
+
+        Returns:
+            tuple: (past, latest, change) arrays over the materials; NaN where there is no earlier close.
+        """
+        latest = self.filled[side, :, -1]
+        past = self.filled[side, :, -1 - days]
+        return past, latest, latest - past
+
+    def top_movers(self, side: int, days: int, percent: bool = True, materials: set | None = None, limit: int = 10) -> list[tuple]:
+        """
+        Rank the materials by the size of their price change. Materials without orders on either day are left out.
+
+        Args:
+            side (int): SIDES["BUY"] or SIDES["SELL"].
+            days (int): The period, between 1 and the matrix length - 1.
+            percent (bool): Rank by percentage instead of absolute change.
+            materials (set | None): Only rank these materials.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list[tuple]: (material, past, latest, change, percent change), largest movement first.
+        """
+        past, latest, change = self.changes(side, days)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative = np.where(past > 0, change / past * 100, np.nan)
+        score = np.abs(relative if percent else change)
+
+        # A price of 0 means the side had no orders, not that the item became free
+        with np.errstate(invalid='ignore'):
+            valid = ~np.isnan(score) & (past > 0) & (latest > 0)
+        if materials is not None:
+            valid &= np.isin(np.array(self.materials, dtype=object), list(materials))
+        candidates = np.flatnonzero(valid)
+        order = candidates[np.argsort(-score[candidates], kind='stable')][:limit]
+        return [(self.materials[i], past[i], latest[i], change[i], relative[i]) for i in order]
+
+    def stats(self, window: int = 14) -> dict[str, MarketStats]:
+        """
+        Compute the derived statistics of all materials at once.
+
+        Days without a sample or without orders are left out instead of being counted as zero or as the previous price:
+        - average_7 / average_14: mean close of the days with a sample in the last 7 / 14 days.
+        - volatility: standard deviation of the day-over-day changes in percent, over the pairs of consecutive days
+          in the window that both have a close.
+        - orders_trend: least-squares slope of the active orders per day over the window.
+
+        Args:
+            window (int): Days used for the volatility and the order trend.
+
+        Returns:
+            dict[str, MarketStats]: Material -> statistics.
+        """
+        close = self.close[..., -window:]
+        average_7 = window_mean(self.close[..., -7:])
+        average_14 = window_mean(self.close[..., -14:])
+
+        # Day-over-day changes; NaN unless both days have a close
+        with np.errstate(divide='ignore', invalid='ignore'):
+            changes = (close[..., 1:] / close[..., :-1] - 1) * 100
+        changes[~np.isfinite(changes)] = np.nan
+        count = np.sum(~np.isnan(changes), axis=-1)
+        deviation = changes - window_mean(changes)[..., None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volatility = np.where(count >= 2, np.sqrt(np.nansum(deviation ** 2, axis=-1) / (count - 1)), np.nan)
+
+        # Regression of the active orders on the day, over the days that have a count
+        orders = self.orders[..., -window:]
+        valid = ~np.isnan(orders)
+        days = np.arange(orders.shape[-1])
+        centered_days = np.where(valid, days - window_mean(np.where(valid, days, np.nan))[..., None], 0)
+        centered_orders = np.where(valid, orders - window_mean(orders)[..., None], 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            orders_trend = np.where(valid.sum(axis=-1) >= 2,
+                                    np.sum(centered_days * centered_orders, axis=-1) / np.sum(centered_days ** 2, axis=-1),
+                                    np.nan)
+
+        # One conversion pass into plain records, so serving the statistics is a dictionary lookup
+        buy, sell = np.stack([average_7, average_14, volatility, orders_trend], axis=-1).tolist()
+        return {material: MarketStats(SideStats(*to_optional(buy[i])), SideStats(*to_optional(sell[i])))
+                for i, material in enumerate(self.materials)}
@@ -0,0 +1,197 @@
+import time
+import asyncio
+import aiohttp
+from datetime import datetime as dt
+from utils.cache import LRUCache
+
+class MojangError(Exception):
+    """The Mojang API answered in a way that says nothing about whether a name exists, e.g. 429, 5xx or a malformed body."""
+
+class UUIDResolver:
+    """
+    Resolves Minecraft usernames to UUIDs.
+
+    Lookups go through an in-memory LRU, then the `users` table of the reputation database (trusted for `ttl` seconds),
+    and only then to the Mojang API. Concurrent lookups of the same name share one request, and unknown names are
+    remembered for `miss_ttl` seconds. Network lookups arriving within `batch_window` seconds are sent together to
+    the bulk profile endpoint.
+    """
+
+    # The bulk endpoint accepts at most this many names per request
+    BULK_LIMIT = 10
+
+    # Statuses of the profile endpoint meaning the name does not exist
+    MISSING_STATUSES = {204, 404}
+
+    def __init__(self, http, db, cache_size: int = 4096,
+                 ttl: float = 7 * 86400, miss_ttl: float = 600, batch_window: float = 0.05,
+                 profile_url: str = "https://api.mojang.com/users/profiles/minecraft",
+                 bulk_url: str = "https://api.minecraftservices.com/minecraft/profile/lookup/bulk/byname"):
+        """
+        Initialize the resolver.
+
+        Args:
+            http (HttpClient): The bot-wide HTTP client.
+            db (Database): The reputation database holding the `users` table.
+            cache_size (int): Number of names kept in memory.
+            ttl (float): Seconds a stored name -> UUID mapping is considered fresh.
+            miss_ttl (float): Seconds an unknown name is remembered as unknown.
+            batch_window (float): Seconds network lookups are collected before they are sent as one bulk request.
+            profile_url (str): Endpoint resolving a single name, used if the bulk endpoint fails.
+            bulk_url (str): Endpoint resolving a list of names per POST.
+        """
+        self.http = http
+        self.db = db
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.batch_window = batch_window
+        self.profile_url = profile_url
+        self.bulk_url = bulk_url
+        self.cache = LRUCache(cache_size)
+        self.misses = LRUCache(cache_size)
+        self.pending = {}
+        self.batch = {}
+        self.flush_handle = None
+
+    async def resolve(self, username: str) -> str | None:
+        """
+        Return the UUID of a Minecraft username, or None if the name does not exist.
+
+        Args:
+            username (str): The Minecraft username, in any capitalization.
+
+        Returns:
+            str | None: The UUID without dashes.
+        """
+        key = username.lower()
+        now = time.time()
+
+        cached = self.cache.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        if self.misses.get(key, 0) > now:
+            return None
+
+        task = self.pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.lookup(username))
+            task.add_done_callback(lambda _: self.pending.pop(key, None))
+            self.pending[key] = task
+        return await asyncio.shield(task)
+
+    async def resolve_many(self, usernames: list[str]) -> dict[str, str | None]:
+        """
+        Resolve several usernames at once; the ones needing the network share bulk requests.
+
+        Args:
+            usernames (list[str]): Minecraft usernames.
+
+        Returns:
+            dict[str, str | None]: Username as given -> UUID, or None if the name does not exist.
+        """
+        uuids = await asyncio.gather(*(self.resolve(username) for username in usernames))
+        return dict(zip(usernames, uuids))
+
+    async def lookup(self, username: str) -> str | None:
+        """Resolve a name that is not in memory: from the users table if fresh, else from the Mojang API."""
+        key = username.lower()
+        now = time.time()
+
+        row = await self.db.fetchone("""SELECT uuid, updated_at FROM users WHERE username = ? COLLATE NOCASE
+                                        ORDER BY updated_at DESC LIMIT 1""", (username,))
+        if row and row[1] and row[1] + self.ttl > now:
+            self.cache.put(key, (row[0], row[1] + self.ttl))
+            return row[0]
+
+        try:
+            uuid, name = await self.fetch_batched(username)
+        except (aiohttp.ClientError, asyncio.TimeoutError, MojangError) as e:
+            current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"[{current_time}] Failed to resolve {username}: {e}")
+            # Better a stale mapping than none while Mojang is unreachable or rate limiting; nothing is cached
+            return row[0] if row else None
+
+        if uuid is None:
+            self.misses.put(key, now + self.miss_ttl)
+            return None
+
+        await self.store(uuid, name, now)
+        self.cache.put(key, (uuid, now + self.ttl))
+        return uuid
+
+    async def fetch_batched(self, username: str) -> tuple[str | None, str | None]:
+        """Queue a name for the next bulk request and return its (UUID, canonical name), or (None, None)."""
+        key = username.lower()
+        if key not in self.batch:
+            self.batch[key] = (username, asyncio.get_running_loop().create_future())
+        if self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.batch_window, lambda: asyncio.ensure_future(self.flush()))
+        return await asyncio.shield(self.batch[key][1])
+
+    async def flush(self):
+        """Send the queued names as bulk requests and hand each waiter its result."""
+        batch, self.batch, self.flush_handle = list(self.batch.values()), {}, None
+        for start in range(0, len(batch), self.BULK_LIMIT):
+            chunk = batch[start:start + self.BULK_LIMIT]
+            try:
+                found = await self.fetch_many([username for username, _ in chunk])
+            except Exception as e:
+                for _, future in chunk:
+                    future.set_exception(e)
+                continue
+            for username, future in chunk:
+                future.set_result(found.get(username.lower(), (None, None)))
+
+    async def fetch_many(self, usernames: list[str]) -> dict[str, tuple[str, str]]:
+        """
+        Ask the Mojang bulk endpoint for up to BULK_LIMIT names.
+
+        Falls back to one request per name if the bulk endpoint does not answer successfully. Names missing from a
+        successful answer do not exist.
+
+        Raises:
+            MojangError: If the bulk answer is malformed or a fallback lookup failed; the whole chunk is then treated
+                as unresolved.
+
+        Returns:
+            dict[str, tuple[str, str]]: Lowercase name -> (UUID, canonical name) for every existing name.
+        """
+        response = await self.http.post(self.bulk_url, json=usernames)
+        if response.status == 200:
+            try:
+                return {profile["name"].lower(): (profile["id"], profile["name"]) for profile in response.json()}
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                raise MojangError(f"bulk lookup answered with a malformed body: {e!r}") from e
+
+        found = {}
+        for username, (uuid, name) in zip(usernames, await asyncio.gather(*(self.fetch(username) for username in usernames))):
+            if uuid is not None:
+                found[username.lower()] = (uuid, name)
+        return found
+
+    async def fetch(self, username: str) -> tuple[str | None, str | None]:
+        """
+        Ask the Mojang API for a single name and return its (UUID, canonical name), or (None, None) if it does not exist.
+
+        Raises:
+            MojangError: If the API answered with any other status, e.g. 429 after all retries, or a malformed body.
+        """
+        response = await self.http.get(f"{self.profile_url}/{username}")
+        if response.status == 200:
+            try:
+                data = response.json()
+                return data["id"], data.get("name", username)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                raise MojangError(f"profile lookup answered with a malformed body: {e!r}") from e
+        if response.status in self.MISSING_STATUSES:
+            return None, None
+        raise MojangError(f"profile lookup answered {response.status}")
+
+    async def store(self, uuid: str, username: str, updated_at: float):
+        """Record a resolved name in the users table."""
+        async with self.db.transaction() as db:
+            cursor = await db.execute("UPDATE users SET username = ?, updated_at = ? WHERE uuid = ?",
+                                      (username, int(updated_at), uuid))
+            if cursor.rowcount == 0:
+                await db.execute("INSERT INTO users (uuid, username, updated_at) VALUES (?, ?, ?)",
+                                 (uuid, username, int(updated_at)))
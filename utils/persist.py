@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Data files are written as {"__format__": FORMAT_VERSION, "data": ...}; files without the header are read as plain JSON
+FORMAT_KEY = "__format__"
+FORMAT_VERSION = 1
+
+# All data file I/O runs on this thread, off the event loop and never two writes at once
+io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="data-io")
+
+def encode(data) -> bytes:
+    """Serialize data into a compact, versioned JSON document."""
+    return json.dumps({FORMAT_KEY: FORMAT_VERSION, "data": data}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def encode_raw(body: bytes) -> bytes:
+    """Wrap an already serialized JSON document into the versioned envelope without parsing it."""
+    return b'{"%s":%d,"data":%s}' % (FORMAT_KEY.encode(), FORMAT_VERSION, body)
+
+def decode(raw: bytes):
+    """
+    Parse a data file, unwrapping the versioned envelope if present.
+
+    Raises:
+        ValueError: If the document is not valid JSON or was written by a newer format version.
+    """
+    document = json.loads(raw)
+    if isinstance(document, dict) and FORMAT_KEY in document:
+        if document[FORMAT_KEY] > FORMAT_VERSION:
+            raise ValueError(f"unsupported data format version {document[FORMAT_KEY]}")
+        return document["data"]
+    return document
+
+def load_json(path: str):
+    """Read a data file written by `save_json` or a plain JSON file."""
+    with open(path, "rb") as f:
+        return decode(f.read())
+
+def write_atomic(path: str, payload: bytes):
+    """
+    Replace a file with new content so readers see either the old or the new file, never a partial one.
+
+    The content goes to a temporary file in the same directory, is flushed to disk, and then renamed over the target.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    # Persist the rename itself
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def save_json(path: str, data):
+    """Atomically write data to a versioned, compact data file. Blocking; use `write_json` on the event loop."""
+    write_atomic(path, encode(data))
+
+async def run_io(func, *args):
+    """Run a blocking data file function on the I/O thread."""
+    return await asyncio.get_running_loop().run_in_executor(io_executor, func, *args)
+
+async def write_json(path: str, data):
+    """Serialize and atomically write data on the I/O thread."""
+    await run_io(save_json, path, data)
+
+async def write_json_bytes(path: str, body: bytes):
+    """Atomically write an already serialized JSON document, e.g. an API response, on the I/O thread."""
+    await run_io(write_atomic, path, encode_raw(body))
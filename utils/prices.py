@@ -0,0 +1,42 @@
+from typing import NamedTuple
+from utils.persist import save_json
+
+class PriceRecord(NamedTuple):
+    """Compact per-item price record of the flat material index."""
+    category: str
+    buy: float | None
+    sell: float | None
+    buy_orders: int | None
+    sell_orders: int | None
+
+def build_price_index(prices_data: dict) -> dict[str, PriceRecord]:
+    """
+    Flatten the category -> material -> [orders] payload of /market/prices into a material -> PriceRecord dict.
+
+    Args:
+        prices_data (dict): The prices payload as returned by the market API.
+
+    Returns:
+        dict[str, PriceRecord]: One record per material.
+    """
+    index = {}
+    for category, items in prices_data.items():
+        for material, orders in items.items():
+            buy = sell = buy_orders = sell_orders = None
+            for price_info in orders:
+                if price_info['orderSide'] == 'BUY':
+                    buy = price_info['price']
+                    buy_orders = price_info.get('activeOrders')
+                elif price_info['orderSide'] == 'SELL':
+                    sell = price_info['price']
+                    sell_orders = price_info.get('activeOrders')
+            index[material] = PriceRecord(category, buy, sell, buy_orders, sell_orders)
+    return index
+
+def decode_price_index(data: dict) -> dict[str, PriceRecord]:
+    """Turn the persisted material -> [category, buy, sell, buy_orders, sell_orders] lists back into records."""
+    return {material: PriceRecord(*record) for material, record in data.items()}
+
+def save_price_index(index: dict[str, PriceRecord], path: str = "data/price_index.json"):
+    """Persist the flat price index as compact material -> list records. Blocking; run it on the I/O thread."""
+    save_json(path, {material: list(record) for material, record in index.items()})
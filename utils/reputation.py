@@ -0,0 +1,206 @@
+import aiosqlite
+from datetime import datetime as dt
+
+async def create_tables(db: aiosqlite.Connection):
+    """Version 1: the original reputation and users tables."""
+    await db.execute("""CREATE TABLE IF NOT EXISTS reputation (
+                        id INTEGER PRIMARY KEY,
+                        giver_id TEXT NOT NULL,
+                        receiver_uuid TEXT NOT NULL,
+                        reputation INTEGER NOT NULL,
+                        UNIQUE(giver_id, receiver_uuid))""")
+    await db.execute("""CREATE TABLE IF NOT EXISTS users (
+                        id INTEGER PRIMARY KEY,
+                        uuid TEXT NOT NULL,
+                        username TEXT NOT NULL,
+                        updated_at INTEGER)""")
+
+    # Databases created before the UUID resolver lack the freshness column
+    cursor = await db.execute("PRAGMA table_info(users)")
+    if "updated_at" not in [column[1] for column in await cursor.fetchall()]:
+        await db.execute("ALTER TABLE users ADD COLUMN updated_at INTEGER")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users (username COLLATE NOCASE)")
+
+async def add_totals(db: aiosqlite.Connection):
+    """
+    Version 2: indexes for receiver and UUID lookups, and reputation totals maintained by triggers.
+
+    `reputation_totals` holds one row per receiver (scope 'receiver', subject = Minecraft UUID) and per giver
+    (scope 'giver', subject = Discord user ID) with the sum of positive votes, the sum of negative votes, their
+    overall sum and the number of votes, so reading a total is a single primary key lookup.
+    """
+    # Keep only the most recent row per UUID before making it unique
+    await db.execute("""DELETE FROM users WHERE id NOT IN (
+                            SELECT id FROM (
+                                SELECT id, ROW_NUMBER() OVER (PARTITION BY uuid ORDER BY updated_at DESC NULLS LAST, id DESC) AS rank
+                                FROM users)
+                            WHERE rank = 1)""")
+    await db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_users_uuid ON users (uuid)")
+
+    # UNIQUE(giver_id, receiver_uuid) already serves lookups by giver
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_reputation_receiver ON reputation (receiver_uuid, reputation)")
+
+    await db.execute("""CREATE TABLE IF NOT EXISTS reputation_totals (
+                        scope TEXT NOT NULL,
+                        subject TEXT NOT NULL,
+                        positive INTEGER NOT NULL DEFAULT 0,
+                        negative INTEGER NOT NULL DEFAULT 0,
+                        overall INTEGER NOT NULL DEFAULT 0,
+                        votes INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (scope, subject)) WITHOUT ROWID""")
+
+    # Add or remove one vote for both the receiver and the giver
+    def apply(row: str, sign: str) -> str:
+        return "\n".join(
+            f"""INSERT INTO reputation_totals (scope, subject, positive, negative, overall, votes)
+                VALUES ('{scope}', {row}.{column}, {sign}max({row}.reputation, 0), {sign}min({row}.reputation, 0),
+                        {sign}{row}.reputation, {sign}1)
+                ON CONFLICT (scope, subject) DO UPDATE SET
+                    positive = positive + excluded.positive,
+                    negative = negative + excluded.negative,
+                    overall = overall + excluded.overall,
+                    votes = votes + excluded.votes;"""
+            for scope, column in (("receiver", "receiver_uuid"), ("giver", "giver_id"))
+        )
+
+    await db.execute(f"""CREATE TRIGGER IF NOT EXISTS reputation_totals_insert AFTER INSERT ON reputation BEGIN
+                         {apply("NEW", "")}
+                         END""")
+    await db.execute(f"""CREATE TRIGGER IF NOT EXISTS reputation_totals_update
+                         AFTER UPDATE OF giver_id, receiver_uuid, reputation ON reputation BEGIN
+                         {apply("OLD", "-")}
+                         {apply("NEW", "")}
+                         END""")
+    await db.execute(f"""CREATE TRIGGER IF NOT EXISTS reputation_totals_delete AFTER DELETE ON reputation BEGIN
+                         {apply("OLD", "-")}
+                         END""")
+
+    # Backfill the totals from the votes recorded so far
+    await db.execute("DELETE FROM reputation_totals")
+    for scope, column in (("receiver", "receiver_uuid"), ("giver", "giver_id")):
+        await db.execute(f"""INSERT INTO reputation_totals (scope, subject, positive, negative, overall, votes)
+                             SELECT '{scope}', {column}, sum(max(reputation, 0)), sum(min(reputation, 0)), sum(reputation), count(*)
+                             FROM reputation GROUP BY {column}""")
+
+async def add_revision(db: aiosqlite.Connection):
+    """Version 3: count how often a vote was changed, so a single upsert can report whether it inserted or changed it."""
+    await db.execute("ALTER TABLE reputation ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+
+async def add_ranking(db: aiosqlite.Connection):
+    """
+    Version 4: the guild a vote was cast in, and a receiver ranking maintained by triggers.
+
+    `reputation_ranking` holds the totals of every receiver once for all votes (guild_id '') and once per guild the
+    votes were cast in. Its index is ordered like the leaderboard, so reading a page touches only the rows shown.
+    Votes cast before this version have no guild and only count towards the global ranking.
+    """
+    await db.execute("ALTER TABLE reputation ADD COLUMN guild_id TEXT")
+    await db.execute("""CREATE TABLE IF NOT EXISTS reputation_ranking (
+                        guild_id TEXT NOT NULL,
+                        receiver_uuid TEXT NOT NULL,
+                        positive INTEGER NOT NULL DEFAULT 0,
+                        negative INTEGER NOT NULL DEFAULT 0,
+                        overall INTEGER NOT NULL DEFAULT 0,
+                        votes INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (guild_id, receiver_uuid)) WITHOUT ROWID""")
+    await db.execute("""CREATE INDEX IF NOT EXISTS idx_reputation_ranking
+                        ON reputation_ranking (guild_id, overall DESC, positive DESC, receiver_uuid)""")
+
+    # Add or remove one vote in the global ranking and in the ranking of its guild
+    def apply(row: str, sign: str) -> str:
+        return f"""INSERT INTO reputation_ranking (guild_id, receiver_uuid, positive, negative, overall, votes)
+                   SELECT guild, {row}.receiver_uuid, {sign}max({row}.reputation, 0), {sign}min({row}.reputation, 0),
+                          {sign}{row}.reputation, {sign}1
+                   FROM (SELECT '' AS guild UNION ALL SELECT {row}.guild_id WHERE {row}.guild_id IS NOT NULL) WHERE true
+                   ON CONFLICT (guild_id, receiver_uuid) DO UPDATE SET
+                       positive = positive + excluded.positive,
+                       negative = negative + excluded.negative,
+                       overall = overall + excluded.overall,
+                       votes = votes + excluded.votes;"""
+
+    await db.execute(f"""CREATE TRIGGER IF NOT EXISTS reputation_ranking_insert AFTER INSERT ON reputation BEGIN
+                         {apply("NEW", "")}
+                         END""")
+    await db.execute(f"""CREATE TRIGGER IF NOT EXISTS reputation_ranking_update
+                         AFTER UPDATE OF receiver_uuid, reputation, guild_id ON reputation BEGIN
+                         {apply("OLD", "-")}
+                         {apply("NEW", "")}
+                         END""")
+    await db.execute(f"""CREATE TRIGGER IF NOT EXISTS reputation_ranking_delete AFTER DELETE ON reputation BEGIN
+                         {apply("OLD", "-")}
+                         END""")
+
+    # Backfill the global ranking from the votes recorded so far
+    await db.execute("""INSERT INTO reputation_ranking (guild_id, receiver_uuid, positive, negative, overall, votes)
+                        SELECT '', receiver_uuid, sum(max(reputation, 0)), sum(min(reputation, 0)), sum(reputation), count(*)
+                        FROM reputation GROUP BY receiver_uuid""")
+
+# Schema versions in order; the database's user_version is the number of migrations applied
+MIGRATIONS = [create_tables, add_totals, add_revision, add_ranking]
+
+async def migrate(database):
+    """
+    Bring the reputation database up to the latest schema version.
+
+    Each migration runs in its own transaction together with the user_version bump, so an interrupted migration is
+    retried on the next start.
+
+    Args:
+        database (Database): The connected reputation database.
+    """
+    version = (await database.fetchone("PRAGMA user_version"))[0]
+    for number, migration in enumerate(MIGRATIONS[version:], version + 1):
+        async with database.transaction() as db:
+            await migration(db)
+            await db.execute(f"PRAGMA user_version = {number}")
+        current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[{current_time}] Migrated {database.path} to schema version {number}")
+
+async def totals(database, scope: str, subjects: list) -> dict:
+    """
+    Read the maintained reputation totals of several receivers or givers.
+
+    Args:
+        database (Database): The connected reputation database.
+        scope (str): 'receiver' for Minecraft UUIDs or 'giver' for Discord user IDs.
+        subjects (list): The UUIDs or user IDs.
+
+    Returns:
+        dict: Subject as stored (text) -> (positive, negative, overall) for every subject with at least one vote.
+    """
+    rows = await database.fetchall(
+        f"""SELECT subject, positive, negative, overall FROM reputation_totals
+            WHERE scope = ? AND subject IN ({','.join('?' * len(subjects))}) AND votes > 0""",
+        (scope, *map(str, subjects))
+    )
+    return {subject: (positive, negative, overall) for subject, positive, negative, overall in rows}
+
+# Leaderboard orders; "bottom" is the exact reverse of idx_reputation_ranking, so both are plain index scans
+RANKING_ORDERS = {
+    "top": "r.overall DESC, r.positive DESC, r.receiver_uuid",
+    "bottom": "r.overall, r.positive, r.receiver_uuid DESC",
+}
+
+async def ranking(database, guild_id: int | None, page: int, per_page: int = 10, order: str = "top") -> list[tuple]:
+    """
+    Read one page of the receiver leaderboard.
+
+    Args:
+        database (Database): The connected reputation database.
+        guild_id (int | None): The guild whose votes are ranked, or None for all votes.
+        page (int): The page number, starting at 1.
+        per_page (int): Number of receivers per page.
+        order (str): "top" for the highest overall reputation first, "bottom" for the lowest first.
+
+    Returns:
+        list[tuple]: Up to `per_page + 1` rows of (receiver_uuid, username, positive, negative, overall); an extra row
+        means there is a next page.
+    """
+    return await database.fetchall(
+        f"""SELECT r.receiver_uuid, u.username, r.positive, r.negative, r.overall
+            FROM reputation_ranking r LEFT JOIN users u ON u.uuid = r.receiver_uuid
+            WHERE r.guild_id = ? AND r.votes > 0
+            ORDER BY {RANKING_ORDERS[order]}
+            LIMIT ? OFFSET ?""",
+        ("" if guild_id is None else str(guild_id), per_page + 1, (page - 1) * per_page)
+    )
@@ -0,0 +1,238 @@
+import bisect
+import numpy as np
+from utils.cache import LRUCache
+
+def levenshtein_distance(s1: str, s2: str) -> int:
+    """
+    Calculate the Levenshtein distance between two strings.
+
+    Args:
+        s1 (str): First string.
+        s2 (str): Second string.
+
+    Returns:
+        int: The Levenshtein distance between the two strings.
+    """
+    if len(s1) < len(s2):
+        return levenshtein_distance(s2, s1)
+
+    if len(s2) == 0:
+        return len(s1)
+
+    previous_row = range(len(s2) + 1)
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            current_row.append(min(insertions, deletions, substitutions))
+        previous_row = current_row
+
+    return previous_row[-1]
+
+def trigrams(s: str) -> set[str]:
+    """Return the set of character trigrams of a string."""
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+class SearchIndex:
+    """
+    Fuzzy search over entries that each have one or more names.
+
+    Entries with a name containing the query as a substring rank first. Within each group, entries are ordered by the
+    smallest Levenshtein distance between the query and any of their names, then by their position in the input.
+    Substring candidates come from a trigram inverted index. The distances to all names are computed at once with a
+    bit-parallel edit distance (Myers/Hyyrö) vectorized over the names with NumPy.
+    """
+
+    # Names longer than this fall back to the plain dynamic programming distance
+    MAX_NAME_LENGTH = 64
+
+    def __init__(self, entries: dict, cache_size: int = 1024):
+        """
+        Build the index.
+
+        Args:
+            entries (dict): Entry key -> tuple of names it can be found by.
+            cache_size (int): Number of query results kept in an LRU cache.
+        """
+        self.keys = list(entries)
+        self.positions = {key: position for position, key in enumerate(self.keys)}
+        self.display_names = [tuple(names) for names in entries.values()]
+        self.names = [tuple(name.lower() for name in names) for names in entries.values()]
+
+        # Sorted (word suffix, position, name index) of every word start in every name, for prefix lookups
+        self.prefixes = sorted((name[start:], position, name_index)
+                               for position, names in enumerate(self.names)
+                               for name_index, name in enumerate(names)
+                               for start in range(len(name))
+                               if start == 0 or name[start - 1] in " _-")
+
+        # Trigram -> positions of the entries having it in one of their names
+        self.postings = {}
+        for position, names in enumerate(self.names):
+            for name in names:
+                for trigram in trigrams(name):
+                    self.postings.setdefault(trigram, set()).add(position)
+
+        # Bit-parallel pattern masks of all names: bit i of name_masks[c][row] is set if that name has character c at i
+        rows = [(name, position) for position, names in enumerate(self.names) for name in names]
+        self.alphabet = {char: code for code, char in enumerate(sorted({c for name, _ in rows for c in name}), start=1)}
+        self.name_masks = np.zeros((len(self.alphabet) + 1, len(rows)), dtype=np.uint64)
+        for row, (name, _) in enumerate(rows):
+            for i, c in enumerate(name[:self.MAX_NAME_LENGTH]):
+                self.name_masks[self.alphabet[c], row] |= np.uint64(1 << i)
+        self.name_lengths = np.array([len(name) for name, _ in rows], dtype=np.int64)
+        self.name_tops = np.array([1 << (len(name) - 1) if 0 < len(name) <= self.MAX_NAME_LENGTH else 0
+                                   for name, _ in rows], dtype=np.uint64)
+        self.name_owners = np.array([position for _, position in rows], dtype=np.int64)
+        # Names that do not fit into a 64-bit mask get the plain dynamic programming distance
+        self.long_names = [(row, name) for row, (name, _) in enumerate(rows) if len(name) > self.MAX_NAME_LENGTH]
+
+        self.cache = LRUCache(cache_size)
+
+    def substring_matches(self, query: str) -> list[int]:
+        """Return the positions of all entries with a name containing the query."""
+        query_trigrams = trigrams(query)
+        if query_trigrams:
+            postings = sorted((self.postings.get(trigram, set()) for trigram in query_trigrams), key=len)
+            candidates = sorted(set.intersection(*postings))
+        else:
+            candidates = range(len(self.names))
+        return [position for position in candidates if any(query in name for name in self.names[position])]
+
+    def distances(self, query: str) -> np.ndarray:
+        """Return, for every entry, the smallest Levenshtein distance between the query and one of its names."""
+        count = len(self.name_lengths)
+        scores = self.name_lengths.copy()
+        one = np.uint64(1)
+        pv = np.full(count, np.iinfo(np.uint64).max, dtype=np.uint64)
+        mv = np.zeros(count, dtype=np.uint64)
+        xh = np.empty(count, dtype=np.uint64)
+        xv = np.empty(count, dtype=np.uint64)
+        ph = np.empty(count, dtype=np.uint64)
+        mh = np.empty(count, dtype=np.uint64)
+
+        # The names are the patterns and the query is the text, so there is one step per query character.
+        # Bits above a name's length collect garbage, but carries and shifts only move it further up.
+        for c in query:
+            eq = self.name_masks[self.alphabet.get(c, 0)]
+            np.bitwise_or(eq, mv, out=xv)
+            np.bitwise_and(eq, pv, out=xh)
+            xh += pv
+            xh ^= pv
+            xh |= eq
+            np.bitwise_or(xh, pv, out=ph)
+            np.invert(ph, out=ph)
+            ph |= mv
+            np.bitwise_and(pv, xh, out=mh)
+
+            # The distance moves up or down with the last pattern bit of the horizontal deltas
+            scores += (ph & self.name_tops) != 0
+            scores -= (mh & self.name_tops) != 0
+
+            np.left_shift(ph, one, out=mv)
+            mv |= one
+            np.left_shift(mh, one, out=pv)
+            np.bitwise_or(xv, mv, out=xh)
+            np.invert(xh, out=xh)
+            pv |= xh
+            mv &= xv
+
+        for row, name in self.long_names:
+            scores[row] = levenshtein_distance(query, name)
+
+        distances = np.full(len(self.names), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(distances, self.name_owners, scores)
+        return distances
+
+    def search(self, query: str, limit: int = 1) -> list:
+        """
+        Return the keys of the best matching entries for a query, best first.
+
+        Args:
+            query (str): The search text.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list: Up to limit entry keys.
+        """
+        query = query.lower()
+        cache_key = (query, limit)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        matches = self.substring_matches(query)
+        if len(matches) >= limit:
+            # Enough substring hits: only their distances matter, and a containing name is exactly the length difference away
+            ranked = []
+            for position in matches:
+                names = self.names[position]
+                distance = min(len(name) - len(query) for name in names if query in name)
+                for name in names:
+                    if query not in name and abs(len(name) - len(query)) < distance:
+                        distance = min(distance, levenshtein_distance(query, name))
+                ranked.append((distance, position))
+            results = [self.keys[position] for _, position in sorted(ranked)[:limit]]
+        else:
+            not_substring = np.ones(len(self.names), dtype=bool)
+            not_substring[matches] = False
+            distances = self.distances(query)
+            order = np.lexsort((np.arange(len(self.names)), distances, not_substring))[:limit]
+            results = [self.keys[position] for position in order]
+
+        self.cache.put(cache_key, results)
+        return results
+
+    def suggest(self, prefix: str, limit: int = 25) -> list[tuple]:
+        """
+        Return completions for a partially typed name, e.g. for slash command autocomplete.
+
+        Entries with a word starting with the prefix come first, shorter names before longer ones. The rest is
+        filled up with the regular search results.
+
+        Args:
+            prefix (str): The text typed so far.
+            limit (int): Maximum number of completions.
+
+        Returns:
+            list[tuple]: Up to limit (entry key, matching name) pairs.
+        """
+        prefix = prefix.lower()
+        cache_key = ("suggest", prefix, limit)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if not prefix:
+            results = [(key, names[0]) for key, names in zip(self.keys, self.display_names)][:limit]
+            self.cache.put(cache_key, results)
+            return results
+
+        # Collect every entry with a word starting with the prefix, keeping its best matching name
+        hits = {}
+        for suffix, position, name_index in self.prefixes[bisect.bisect_left(self.prefixes, (prefix,)):]:
+            if not suffix.startswith(prefix):
+                break
+            name = self.names[position][name_index]
+            rank = (name != suffix, len(name), position)
+            if position not in hits or rank < hits[position][0]:
+                hits[position] = (rank, name_index)
+
+        ranked = sorted(hits.items(), key=lambda hit: hit[1][0])[:limit]
+        results = [(self.keys[position], self.display_names[position][name_index]) for position, (_, name_index) in ranked]
+
+        # Fill up with the regular search results
+        if len(results) < limit:
+            seen = {key for key, _ in results}
+            for key in self.search(prefix, limit):
+                if key in seen or len(results) == limit:
+                    continue
+                position = self.positions[key]
+                names = self.names[position]
+                name_index = next((i for i, name in enumerate(names) if prefix in name), 0)
+                results.append((key, self.display_names[position][name_index]))
+
+        self.cache.put(cache_key, results)
+        return results
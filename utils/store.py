@@ -0,0 +1,80 @@
+from datetime import datetime as dt
+from utils.persist import load_json
+
+class SnapshotStore:
+    """In-process store holding the latest parsed copy of the data files shared by the cogs."""
+
+    def __init__(self, files: dict[str, str], decoders: dict = None):
+        """
+        Initialize an empty store.
+
+        Args:
+            files (dict[str, str]): Dataset name -> JSON file used to populate it on a cold start.
+            decoders (dict): Optional dataset name -> callable turning the parsed JSON into the in-memory form.
+        """
+        self.files = files
+        self.decoders = decoders or {}
+        self.snapshot = {}
+        self.versions = {}
+        self.version = 0
+        self.listeners = []
+
+    def get(self, name: str):
+        """
+        Return the current data for a dataset, reading its file only if nothing was published yet.
+
+        Args:
+            name (str): The dataset name, e.g. "items" or "prices".
+
+        Returns:
+            The parsed data of the dataset.
+        """
+        snapshot = self.snapshot
+        if name in snapshot:
+            return snapshot[name]
+        return self.load(name)
+
+    def load(self, name: str):
+        """Cold start: read a dataset from its file and publish it."""
+        try:
+            data = load_json(self.files[name])
+        except (FileNotFoundError, ValueError) as e:
+            current_time = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"[{current_time}] Could not load {self.files[name]}: {e}")
+            data = {}
+        if name in self.decoders:
+            data = self.decoders[name](data)
+        self.publish(**{name: data})
+        return data
+
+    def publish(self, **datasets):
+        """
+        Atomically replace one or more datasets and bump the version counters.
+
+        Readers holding the previous snapshot keep a consistent view; the new one becomes visible in a single assignment.
+        """
+        snapshot = dict(self.snapshot)
+        snapshot.update(datasets)
+        versions = dict(self.versions)
+        self.version += 1
+        for name in datasets:
+            versions[name] = self.version
+        self.versions = versions
+        self.snapshot = snapshot
+
+        for listener in list(self.listeners):
+            listener(set(datasets))
+
+    def subscribe(self, listener):
+        """
+        Register a callback that is called with the set of dataset names after every publish.
+
+        Args:
+            listener (callable): A synchronous callable; schedule a task from it for async work.
+        """
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """Remove a callback registered with subscribe."""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
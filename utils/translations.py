@@ -0,0 +1,48 @@
+import json
+import os
+import unicodedata
+
+def normalize_string(s: str) -> str:
+    """Normalize strings by removing accents and special characters for comparison."""
+    return unicodedata.normalize('NFKD', s).encode('ascii', 'ignore').decode('utf-8').lower()
+
+class TranslationIndex:
+    """Normalized English name -> German name lookup built from a translations file."""
+
+    def __init__(self, path: str = "data/translations.json"):
+        """
+        Initialize an empty index for the given translations file.
+
+        Args:
+            path (str): Path to the JSON file mapping English strings to German strings.
+        """
+        self.path = path
+        self.mtime = None
+        self.index = {}
+
+    def refresh(self) -> bool:
+        """
+        Rebuild the index if the translations file changed since the last build.
+
+        Returns:
+            bool: True if the index was rebuilt, False if it was already up to date.
+        """
+        mtime = os.path.getmtime(self.path)
+        if mtime == self.mtime:
+            return False
+
+        with open(self.path, "r", encoding='utf-8') as f:
+            translations = json.load(f)
+
+        # Keep the first translation for each normalized key, like the old linear scan did
+        index = {}
+        for key, value in translations.items():
+            index.setdefault(normalize_string(key), value)
+
+        self.index = index
+        self.mtime = mtime
+        return True
+
+    def lookup(self, name: str) -> str | None:
+        """Return the German translation for a formatted English name, or None if there is none."""
+        return self.index.get(normalize_string(name))